@@ -81,8 +81,13 @@ We tend to respond fairly quickly!
 """
 
 import itertools
+import multiprocessing
+import Queue
+from collections import OrderedDict
 
 import sys
+import threading
+import time
 
 if sys.version_info[:2] != (2, 7):
     print("nflgame requires Python 2.7 and does not yet work with Python 3")
@@ -106,10 +111,13 @@ NoPlayers corresponds to the identity element of a Players sequences.
 Namely, adding it to any other Players sequence has no effect.
 """
 
-players = nflgame.player._create_players()
+players = nflgame.player._LazyPlayers()
 """
 A dict of all players and meta information about each player keyed
 by GSIS ID. (The identifiers used by NFL.com GameCenter.)
+
+The player data is read from disk the first time this mapping is used,
+so importing nflgame does not pay for it unless it is needed.
 """
 
 teams = [
@@ -184,7 +192,8 @@ def standard_team(team):
     return None
 
 
-def games(year, week=None, home=None, away=None, kind='REG', started=False):
+def games(year, week=None, home=None, away=None, kind='REG', started=False,
+          workers=None):
     """
     games returns a list of all games matching the given criteria. Each
     game can then be queried for player statistics and information about
@@ -220,12 +229,16 @@ def games(year, week=None, home=None, away=None, kind='REG', started=False):
     started parameter requires pytz to be installed. This is useful when
     you only want to collect stats from games that have JSON data available
     (as opposed to waiting for a 404 error from NFL.com).
+
+    If workers is set to a number greater than 1, finished games are
+    built in that many worker processes. See `nflgame.games_gen`.
     """
-    return list(games_gen(year, week, home, away, kind, started))
+    return list(games_gen(year, week, home, away, kind, started,
+                          workers=workers))
 
 
 def games_gen(year, week=None, home=None, away=None,
-              kind='REG', started=False):
+              kind='REG', started=False, prefetch=0, workers=None):
     """
     games returns a generator of all games matching the given criteria. Each
     game can then be queried for player statistics and information about
@@ -261,10 +274,28 @@ def games_gen(year, week=None, home=None, away=None,
     started parameter requires pytz to be installed. This is useful when
     you only want to collect stats from games that have JSON data available
     (as opposed to waiting for a 404 error from NFL.com).
+
+    If prefetch is set to a positive number, a background thread reads up
+    to that many games ahead of the one being consumed, so that reading
+    game data from disk (or NFL.com) overlaps with whatever is done with
+    each game.
+
+    If workers is set to a number greater than 1, finished games whose
+    data is on disk are built in that many worker processes, which write
+    them to the parsed cache (see `nflgame.game.parsed_cache_dir`). Games
+    are then read from there as usual, so only the summary of each game
+    is read until its drives or player statistics are used. Games are
+    still generated in schedule order, and prefetch is ignored. Without
+    a parsed cache, workers is ignored too.
     """
     infos = _search_schedule(year, week, home, away, kind, started)
     if not infos:
         return None
+    if workers is not None and workers > 1 \
+            and nflgame.game.parsed_cache_dir is not None:
+        return _games_parallel(infos, workers)
+    if prefetch > 0:
+        return _games_prefetched(infos, prefetch)
 
     def gen():
         for info in infos:
@@ -319,6 +350,28 @@ def one(year, week, home, away, kind='REG', started=False):
     return nflgame.game.Game(infos[0]['eid'])
 
 
+def summaries(year, week=None, home=None, away=None, kind='REG',
+              started=False):
+    """
+    summaries returns a list of `nflgame.game.GameSummary` objects of all
+    games matching the given criteria, which are the same as those of
+    `nflgame.games`.
+
+    A summary has the teams, score (in total and by quarter), game clock,
+    winner and team statistics of a game, with the same attribute names
+    as a `nflgame.game.Game`. Getting summaries is much cheaper than
+    getting games, since no player statistics, drives or plays are built.
+    (See `nflgame.game.summary`.)
+    """
+    infos = _search_schedule(year, week, home, away, kind, started)
+    summaries = []
+    for info in infos:
+        s = nflgame.game.summary(info['eid'])
+        if s is not None:
+            summaries.append(s)
+    return summaries
+
+
 def combine(games, plays=False):
     """
     DEPRECATED. Please use one of nflgame.combine_{game,play,max}_stats
@@ -350,11 +403,10 @@ def combine_game_stats(games):
     to statistics across an entire week, some number of weeks or an entire
     season.
     """
-    return reduce(lambda ps1, ps2: ps1 + ps2,
-                  [g.players for g in games if g is not None])
+    return _sum_players(g.players for g in games if g is not None)
 
 
-def combine_play_stats(games):
+def combine_play_stats(games, workers=None):
     """
     Combines a list of games into one big player sequence containing play
     level statistics.
@@ -369,9 +421,15 @@ def combine_play_stats(games):
 
     N.B. Since this combines *all* play data, this function may take a while
     to complete depending on the number of games passed in.
+
+    If workers is set to a number greater than 1, the play level statistics
+    of finished games whose data is on disk are computed in that many worker
+    processes. The result is the same as when workers is not set.
     """
-    return reduce(lambda p1, p2: p1 + p2,
-                  [g.drives.players() for g in games if g is not None])
+    games = [g for g in games if g is not None]
+    if workers is not None and workers > 1:
+        return _combine_play_stats_parallel(games, workers)
+    return _sum_players(g.drives.players() for g in games)
 
 
 def combine_max_stats(games):
@@ -386,8 +444,7 @@ def combine_max_stats(games):
     This function should be used in lieu of combine_game_stats or
     combine_play_stats when the best possible accuracy is desired.
     """
-    return reduce(lambda a, b: a + b,
-                  [g.max_player_stats() for g in games if g is not None])
+    return _sum_players(g.max_player_stats() for g in games if g is not None)
 
 
 def combine_plays(games):
@@ -399,6 +456,163 @@ def combine_plays(games):
     return nflgame.seq.GenPlays(chain)
 
 
+def _games_prefetched(infos, depth):
+    """
+    Generates a game for each schedule dictionary in infos, in order,
+    while a background thread loads up to depth games ahead of the one
+    being consumed. Games that couldn't be loaded are skipped.
+    """
+    loaded = Queue.Queue(depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                loaded.put(item, timeout=0.1)
+                return True
+            except Queue.Full:
+                pass
+        return False
+
+    def load():
+        try:
+            for info in infos:
+                if not put(('game', nflgame.game.Game(info['eid']))):
+                    return
+        except:
+            put(('error', sys.exc_info()))
+            return
+        put(('done', None))
+
+    t = threading.Thread(target=load)
+    t.daemon = True
+    t.start()
+    try:
+        while True:
+            kind, value = loaded.get()
+            if kind == 'done':
+                return
+            if kind == 'error':
+                raise value[0], value[1], value[2]
+            if value is not None:
+                yield value
+    finally:
+        stop.set()
+
+
+def _games_parallel(infos, workers):
+    """
+    Generates a game for each schedule dictionary in infos, in order,
+    where finished games that aren't in the parsed cache yet are built by
+    a pool of worker processes. The workers write them to the parsed
+    cache instead of sending them back, since unpickling whole games here
+    would take longer than building them. Games that couldn't be loaded
+    are skipped.
+    """
+    remote = set(info['eid'] for info in infos
+                 if nflgame.game._needs_parsing(info['eid']))
+    eids = [info['eid'] for info in infos if info['eid'] in remote]
+    pool = multiprocessing.Pool(workers) if eids else None
+    try:
+        if pool is not None:
+            chunksize = max(1, len(eids) // (workers * 4))
+            parsed = pool.imap(_parse_game, eids, chunksize)
+        for info in infos:
+            if info['eid'] in remote:
+                next(parsed)
+            g = nflgame.game.Game(info['eid'])
+            if g is None:
+                continue
+            yield g
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+def _parse_game(eid):
+    """
+    Builds the game represented by eid, which writes it to the parsed
+    cache if it is over. This is run in worker processes by
+    _games_parallel.
+    """
+    nflgame.game.Game(eid)
+    return eid
+
+
+def _sum_players(seqs):
+    """
+    Adds up sequences of player statistics. The result is the same as
+    adding them with +, but repeat players are summed into one sequence
+    instead of building a new sequence for every addition.
+    """
+    players = OrderedDict()
+    for seq in seqs:
+        for p in seq:
+            if p.playerid not in players:
+                players[p.playerid] = p
+            else:
+                players[p.playerid] += p
+    return nflgame.seq.GenPlayerStats(players)
+
+
+def _combine_play_stats_parallel(games, workers):
+    """
+    Combines the play level statistics of games like combine_play_stats,
+    where finished games that can be loaded from disk are handed to a pool
+    of worker processes. Each worker sends back the totals of one game in
+    the compact form returned by _play_stats, which are merged here in the
+    same order as the serial version.
+
+    Games whose drives have already been built, or that could change, are
+    combined in this process while the workers run.
+    """
+    remote = set(g.eid for g in games
+                 if 'drives' not in g.__dict__
+                 and g.game_over() and nflgame.game._is_cached(g.eid))
+    eids = [g.eid for g in games if g.eid in remote]
+    pool = multiprocessing.Pool(workers)
+    try:
+        chunksize = max(1, len(eids) // (workers * 4))
+        results = pool.imap(_play_stats, eids, chunksize)
+        seqs = []
+        for g in games:
+            if g.eid in remote:
+                seqs.append(_play_stats_seq(next(results)))
+            else:
+                seqs.append(g.drives.players())
+    finally:
+        pool.close()
+        pool.join()
+    return _sum_players(seqs)
+
+
+def _play_stats(eid):
+    """
+    Returns the play level statistics of the game represented by eid as a
+    list of (playerid, name, home, team, stats) tuples, where stats is a
+    list of (field, value) pairs. This is run in worker processes by
+    _combine_play_stats_parallel.
+    """
+    g = nflgame.game.Game(eid)
+    nflgame.game.flush_saves()
+    return [(p.playerid, p.name, p.home, p.team, p.stats.items())
+            for p in g.drives.players()]
+
+
+def _play_stats_seq(rows):
+    """
+    Rebuilds a sequence of PlayPlayerStats from the rows returned by
+    _play_stats.
+    """
+    players = OrderedDict()
+    for playerid, name, home, team, stats in rows:
+        p = nflgame.player.PlayPlayerStats(playerid, name, home, team)
+        p._overwrite_stats(OrderedDict(stats))
+        players[playerid] = p
+    return nflgame.seq.GenPlayerStats(players)
+
+
 def _search_schedule(year, week=None, home=None, away=None, kind='REG',
                      started=False):
     """
@@ -428,8 +642,15 @@ def _search_schedule(year, week=None, home=None, away=None, kind='REG',
     you only want to collect stats from games that have JSON data available
     (as opposed to waiting for a 404 error from NFL.com).
     """
+    if home is not None and away is not None and home == away:
+        team = home
+    else:
+        team = home if home is not None else away
+
     infos = []
-    for info in nflgame.sched.games.itervalues():
+    index = nflgame.sched._get_index()
+    cutoff = time.time() + 300
+    for info in index.candidates(year, week, team, kind):
         y, t, w = info['year'], info['season_type'], info['week']
         h, a = info['home'], info['away']
         if year is not None:
@@ -452,10 +673,7 @@ def _search_schedule(year, week=None, home=None, away=None, kind='REG',
                 continue
         if t != kind:
             continue
-        if started:
-            gametime = nflgame.live._game_datetime(info)
-            now = nflgame.live._now()
-            if gametime > now and (gametime - now).total_seconds() > 300:
-                continue
+        if started and index.kickoff(info) > cutoff:
+            continue
         infos.append(info)
     return infos
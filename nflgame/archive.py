@@ -0,0 +1,213 @@
+"""
+The archive module stores GameCenter JSON data in one file per season
+instead of one gzipped file per game.
+
+Each season archive is a zip file named after the season (e.g.,
+`2012.zip`) that lives in the `gamecenter-json` directory. It contains
+one compressed member per game, named by its GSIS identifier. The zip
+central directory serves as an index from GSIS identifier to the
+member's offset in the file, so reading a single game only needs the
+archive to be opened once per process.
+
+Archives are read transparently by `nflgame.game.Game`. Use the
+`nflgame-pack-archives` script to build them from an existing
+`gamecenter-json` directory.
+"""
+from __future__ import absolute_import, division, print_function
+import argparse
+import glob
+import gzip
+import os
+import os.path as path
+import sys
+import tempfile
+import threading
+import zipfile
+
+_json_dir = path.join(path.split(__file__)[0], 'gamecenter-json')
+
+_archives = {}
+"""
+A cache of open archives keyed by file path. A value of None means that
+the archive does not exist.
+"""
+
+_lock = threading.Lock()
+"""
+Guards _archives and reads from open archives.
+"""
+
+
+def season_of(eid):
+    """
+    Returns the season that the game with GSIS identifier eid belongs
+    to. Games played in January through March belong to the previous
+    year's season.
+    """
+    year, month = int(eid[0:4]), int(eid[4:6])
+    if month <= 3:
+        year -= 1
+    return year
+
+
+def archive_path(season, directory=None):
+    """
+    Returns the path of the archive for season in directory. If
+    directory is None, the `gamecenter-json` directory that comes with
+    nflgame is used.
+    """
+    if directory is None:
+        directory = _json_dir
+    return path.join(directory, '%d.zip' % season)
+
+
+def read(eid, directory=None):
+    """
+    Returns the JSON data for the game with GSIS identifier eid from its
+    season's archive. If there is no archive or the game isn't in it,
+    None is returned.
+    """
+    fpath = archive_path(season_of(eid), directory)
+    with _lock:
+        archive = _open(fpath)
+        if archive is None:
+            return None
+        try:
+            return archive.read(eid)
+        except KeyError:
+            return None
+
+
+def contains(eid, directory=None):
+    """
+    Returns true if the game with GSIS identifier eid is in its season's
+    archive.
+    """
+    return info(eid, directory) is not None
+
+
+def info(eid, directory=None):
+    """
+    Returns the `zipfile.ZipInfo` describing the game with GSIS
+    identifier eid in its season's archive, or None if it isn't there.
+    """
+    fpath = archive_path(season_of(eid), directory)
+    with _lock:
+        archive = _open(fpath)
+        if archive is None:
+            return None
+        return archive.NameToInfo.get(eid)
+
+
+def _open(fpath):
+    """
+    Returns the open archive at fpath, or None if it doesn't exist.
+    This must be called with _lock held.
+    """
+    if fpath not in _archives:
+        try:
+            # Given a path, ZipFile opens the file anew for every member
+            # that is read, so processes forked after an archive was
+            # opened don't share (and race on) its file offset.
+            _archives[fpath] = zipfile.ZipFile(fpath)
+        except (IOError, zipfile.BadZipfile):
+            _archives[fpath] = None
+    return _archives[fpath]
+
+
+def pack(directory=None, seasons=None, remove=False, verbose=False):
+    """
+    Packs every `*.json.gz` file in directory into season archives.
+    If directory is None, the `gamecenter-json` directory that comes
+    with nflgame is used. If seasons is not None, only games in those
+    seasons are packed.
+
+    If an archive for a season already exists, the games in it are kept,
+    except that an individual file for the same game always replaces the
+    archived copy (regardless of which is newer).
+
+    Each archive is written to a temporary file and renamed into place.
+    If remove is true, the individual files are deleted once they have
+    been packed.
+    """
+    if directory is None:
+        directory = _json_dir
+
+    by_season = {}
+    for fpath in glob.glob(path.join(directory, '*.json.gz')):
+        eid = path.basename(fpath).split('.')[0]
+        season = season_of(eid)
+        if seasons is not None and season not in seasons:
+            continue
+        by_season.setdefault(season, []).append((eid, fpath))
+
+    for season in sorted(by_season):
+        files = sorted(by_season[season])
+        apath = archive_path(season, directory)
+        if verbose:
+            print('Packing %d games into %s' % (len(files), apath))
+        _write_archive(apath, files)
+        if remove:
+            for _, fpath in files:
+                os.remove(fpath)
+    with _lock:
+        _archives.clear()
+
+
+def _write_archive(apath, files):
+    """
+    Writes the archive at apath with the games in files, which is a list
+    of (eid, gzipped JSON file path) pairs. Games in an existing archive
+    at apath that are not in files are copied over.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.dirname(apath), prefix='.archive-')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            new = zipfile.ZipFile(fp, 'w', zipfile.ZIP_DEFLATED)
+            eids = set(eid for eid, _ in files)
+            if path.exists(apath):
+                old = zipfile.ZipFile(apath)
+                for name in old.namelist():
+                    if name not in eids:
+                        new.writestr(old.getinfo(name), old.read(name))
+                old.close()
+            for eid, fpath in files:
+                new.writestr(eid, gzip.open(fpath).read())
+            new.close()
+        os.chmod(tmp, 0o644)
+        os.rename(tmp, apath)
+    except:
+        os.remove(tmp)
+        raise
+
+
+def eprint(*args, **kwargs):
+    kwargs['file'] = sys.stderr
+    print(*args, **kwargs)
+
+
+def run():
+    parser = argparse.ArgumentParser(
+        description='Packs individually gzipped GameCenter JSON files into '
+                    'one archive per season.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    aa = parser.add_argument
+    aa('--json-dir', type=str, default=None,
+       help='The directory containing *.json.gz files. If this option is '
+            'not set, then the "gamecenter-json" directory that comes with '
+            'nflgame is used.')
+    aa('--season', type=int, action='append', default=None,
+       help='Only pack games from this season. May be given more than '
+            'once.')
+    aa('--remove', action='store_true',
+       help='When set, individual files are deleted after being packed.')
+    args = parser.parse_args()
+
+    directory = args.json_dir or _json_dir
+    if not os.access(directory, os.W_OK):
+        eprint('I do not have write access to "%s".' % directory)
+        sys.exit(1)
+    pack(directory, args.season, args.remove, verbose=True)
+
+if __name__ == '__main__':
+    run()
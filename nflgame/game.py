@@ -1,23 +1,179 @@
 from collections import namedtuple
+import atexit
+import cPickle
+import gc
+import glob
+import hashlib
 import os
 import os.path as path
 import gzip
-import json
+import Queue
 import socket
 import sys
-import urllib2
+import tempfile
+import threading
+import time
 from collections import OrderedDict
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import httplib2
+
+import nflgame.archive
+import nflgame.jsonlib
 import nflgame.player
+import nflgame.results
 import nflgame.sched
 import nflgame.seq
 import nflgame.statmap
+from nflgame.version import __version__
 
 _MAX_INT = sys.maxint
 
 _jsonf = path.join(path.split(__file__)[0], 'gamecenter-json', '%s.json.gz')
 _json_base_url = "http://www.nfl.com/liveupdate/game-center/%s/%s_gtd.json"
 
+parsed_cache_dir = None
+"""
+When set to the path of a writable directory, finished games are also
+cached there in parsed form, with all of their drives, plays and player
+statistics already built. Loading a game from this cache skips JSON
+decoding and object construction entirely.
+
+Entries are keyed by GSIS id and a hash of the nflgame version and the
+on-disk JSON data they were built from, so they are never used once
+either changes. The cache is disabled by default.
+"""
+
+_PARSED_CACHE_VERSION = 5
+"""
+Bumped whenever a change to these classes makes previously cached parsed
+games invalid.
+"""
+
+game_cache_size = 0
+"""
+The maximum number of finished games kept in memory. When it is greater
+than zero, creating a Game for a finished game that was recently created
+returns the very same Game object, and the least recently used games are
+discarded once there are more than this many. Games that are still being
+played are never kept. The cache is disabled by default.
+"""
+
+_game_cache = OrderedDict()
+"""
+The in-memory cache of finished games keyed by GSIS id, in order from
+least to most recently used.
+"""
+
+_game_cache_lock = threading.Lock()
+
+_summaries = {}
+"""
+Summaries of finished games keyed by GSIS id. (See
+`nflgame.game.summary`.) They are small, so all of them are kept.
+"""
+
+lean = False
+"""
+When true, games use less memory by not holding on to raw JSON data
+that they no longer need. Namely, once a finished game is cached on
+disk, its `rawData` string is discarded, and its decoded `data` is
+discarded as soon as its players and drives have been built. (Both are
+transparently read back from disk if they are accessed again.) Plays
+also do not keep their raw JSON in `Play.data`.
+
+Since drives would otherwise hold on to most of the decoded data until
+their plays are accessed, plays are built along with their drives in
+lean mode instead of lazily. (A play still keeps the raw JSON of its
+players until both its events and players have been built.)
+"""
+
+cache_dir = os.getenv('NFLGAME_CACHE_DIR') or None
+"""
+When set to the path of a directory, finished games downloaded from
+NFL.com are saved there instead of in the `gamecenter-json` directory
+that comes with nflgame (which often isn't writable). Games saved there
+are found in addition to the ones that come with nflgame. The directory
+is created if it doesn't exist. It can also be set with the
+NFLGAME_CACHE_DIR environment variable before nflgame is imported.
+"""
+
+cache_max_size = 256 * 1024 * 1024
+"""
+The maximum total size in bytes of the games saved in `cache_dir`. When
+saving a game makes it bigger, the least recently used games are removed
+from it. If it is None, the size of `cache_dir` is not limited.
+"""
+
+background_saves = True
+"""
+When true, finished games that are saved to disk automatically are
+written by a background thread, so that creating a Game never waits on
+compressing and writing its data. Saves that are still pending when
+Python exits are finished first. Use `nflgame.game.flush_saves` to wait
+for them at any other time.
+"""
+
+_save_queue = Queue.Queue()
+"""
+The games waiting to be saved by the background writer, as (game, lock)
+pairs where lock is the game's download lock (or None).
+"""
+
+_saver_pid = None
+"""
+The id of the process in which the background writer was started. A
+process forked from it has to start its own.
+"""
+
+_saver_lock = threading.Lock()
+
+offline = bool(os.getenv('NFLGAME_OFFLINE'))
+"""
+When true, nflgame never downloads game data from NFL.com. Games that
+aren't on disk are unavailable, so e.g. `nflgame.games` skips them right
+away instead of waiting for a network request to fail. It can also be
+turned on by setting the NFLGAME_OFFLINE environment variable to a
+non-empty value before nflgame is imported.
+"""
+
+unavailable_ttl = 60
+"""
+The number of seconds that a game remains known to be unavailable after
+NFL.com reported that it doesn't exist (yet), i.e., responded with a 404.
+Until then, Game returns None for it without trying again. Other failures,
+like network errors, aren't remembered, so the next attempt tries again.
+Set it to 0 to always try.
+"""
+
+_unavailable = {}
+"""
+Maps the GSIS id of games that couldn't be downloaded to the time at
+which downloading them may be tried again.
+"""
+
+_http = threading.local()
+"""
+Holds an HTTP client for each thread, so that connections to NFL.com are
+kept alive between requests. (httplib2.Http objects can't be shared
+between threads.)
+"""
+
+_downloads = {}
+"""
+Maps the GSIS id of each game downloaded from NFL.com that isn't over yet
+to a tuple (etag, last_modified, rawData, game), where game is the Game
+built from rawData (or None). Later downloads of the same game are
+conditional on its data having changed, and when it hasn't, the same Game
+is returned without parsing anything.
+"""
+
+_downloads_lock = threading.Lock()
+
 GameDiff = namedtuple('GameDiff', ['before', 'after', 'plays', 'players'])
 """
 Represents the difference between two points in time of the same game
@@ -32,6 +188,45 @@ TeamStats = namedtuple('TeamStats',
 """A collection of team statistics for an entire game."""
 
 
+def _get_slots(obj):
+    """
+    Returns a dict of the slots of obj that are set. This is the pickled
+    state of classes with __slots__, which can't be pickled with protocol
+    0 or 1 otherwise. Slots that are built lazily and haven't been built
+    yet are left out rather than built.
+    """
+    cls = type(obj)
+    state = {}
+    for name in cls.__slots__:
+        if name.startswith('__'):
+            name = '_%s%s' % (cls.__name__, name)
+        try:
+            state[name] = getattr(cls, name).__get__(obj, cls)
+        except AttributeError:
+            pass
+    return state
+
+
+def _has_slot(obj, name):
+    """
+    Returns true if the slot name of obj is set. Unlike hasattr, this
+    never builds a lazily built attribute.
+    """
+    try:
+        getattr(type(obj), name).__get__(obj, type(obj))
+    except AttributeError:
+        return False
+    return True
+
+
+def _set_slots(obj, state):
+    """
+    Restores the slots of obj from a dict returned by _get_slots.
+    """
+    for name, value in state.iteritems():
+        setattr(obj, name, value)
+
+
 class FieldPosition (object):
     """
     Represents field position.
@@ -48,11 +243,18 @@ class FieldPosition (object):
     to the field offset to get the new field position as the result of the
     play.
     """
+    __slots__ = ('offset',)
+    __getstate__ = _get_slots
+    __setstate__ = _set_slots
+
     def __new__(cls, pos_team=None, yardline=None, offset=None):
         if not yardline and offset is None:
             return None
         return object.__new__(cls)
 
+    def __getnewargs__(self):
+        return (None, None, self.offset)
+
     def __init__(self, pos_team=None, yardline=None, offset=None):
         """
         pos_team is the team on offense, and yardline is a string formatted
@@ -100,6 +302,10 @@ class PossessionTime (object):
     """
     Represents the amount of time a drive lasted in (minutes, seconds).
     """
+    __slots__ = ('clock', 'minutes', 'seconds')
+    __getstate__ = _get_slots
+    __setstate__ = _set_slots
+
     def __init__(self, clock):
         self.clock = clock
 
@@ -145,6 +351,10 @@ class GameClock (object):
     quarter and clock time. Also, GameClock can represent whether
     the game hasn't started yet, is half time or if it's over.
     """
+    __slots__ = ('qtr', 'clock', '_minutes', '_seconds', '__qtr')
+    __getstate__ = _get_slots
+    __setstate__ = _set_slots
+
     def __init__(self, qtr, clock):
         self.qtr = qtr
         self.clock = clock
@@ -212,40 +422,109 @@ class GameClock (object):
             return self.qtr
 
 
-class Game (object):
+class GameSummary (object):
+    """
+    GameSummary is the scoreboard of a single game: the teams playing,
+    the score (in total and by quarter), the game clock, the winner and
+    the team statistics. These attributes have the same names as those
+    of a `nflgame.game.Game` (which is a GameSummary too), but a summary
+    on its own is much cheaper to get, since no player statistics,
+    drives or plays are ever built for it.
+
+    Use `nflgame.game.summary` or `nflgame.summaries` to get summaries.
+    """
+    _fields = ('eid', 'schedule', 'gamekey', 'home', 'away', 'stats_home',
+               'stats_away', 'time', 'down', 'togo', 'score_home',
+               'score_away', 'score_home_q1', 'score_away_q1',
+               'score_home_q2', 'score_away_q2', 'score_home_q3',
+               'score_away_q3', 'score_home_q4', 'score_away_q4',
+               'score_home_q5', 'score_away_q5', 'winner', 'loser')
+    """The names of the attributes that make up a summary."""
+
+    loser = None
+
+    def __init__(self, eid, data):
+        """
+        Creates a summary of the game with GSIS id eid from its decoded
+        GameCenter JSON data.
+        """
+        self.eid = eid
+        self.schedule = nflgame.sched.games.get(eid, None)
+        self.gamekey = None
+        if self.schedule is not None:
+            self.gamekey = self.schedule['gamekey']
+        _json_scoreboard(self, data)
+
+    def is_home(self, team):
+        """Returns true if team (i.e., 'NE') is the home team."""
+        return team == self.home
+
+    def season(self):
+        """Returns the year of the season this game belongs to."""
+        year = int(self.eid[0:4])
+        month = int(self.eid[4:6])
+        if month <= 3:
+            year -= 1
+        return year
+
+    def game_over(self):
+        """game_over returns true if the game is no longer being played."""
+        return self.time.is_final()
+
+    def playing(self):
+        """playing returns true if the game is currently being played."""
+        return not self.time.is_pregame() and not self.time.is_final()
+
+    def nice_score(self):
+        """
+        Returns a string of the score of the game.
+        e.g., "NE (32) vs. NYG (0)".
+        """
+        return '%s (%d) at %s (%d)' \
+               % (self.away, self.score_away, self.home, self.score_home)
+
+    def __str__(self):
+        return self.nice_score()
+
+
+class Game (GameSummary):
     """
     Game represents a single pre- or regular-season game. It provides a window
     into the statistics of every player that played into the game, along with
     the winner of the game, the score and a list of all the scoring plays.
     """
+    _initialized = False
 
     def __new__(cls, eid=None, fpath=None):
-        # If we can't get a valid JSON data, exit out and return None.
-        try:
-            rawData = _get_json_data(eid, fpath)
-        except urllib2.URLError:
-            return None
-        if rawData is None or rawData.strip() == '{}':
-            return None
-        game = object.__new__(cls)
-        game.rawData = rawData
-
-        try:
-            if eid is not None:
-                game.eid = eid
-                game.data = json.loads(game.rawData)[game.eid]
-            else:  # For when we have rawData (fpath) and no eid.
-                game.eid = None
-                game.data = json.loads(game.rawData)
-                for k, v in game.data.iteritems():
-                    if isinstance(v, dict):
-                        game.eid = k
-                        game.data = v
-                        break
-                assert game.eid is not None
-        except ValueError:
-            return None
-
+        if eid is not None:
+            game = _cache_get(eid)
+            if game is not None:
+                return game
+        if eid is not None and parsed_cache_dir is not None:
+            game = _load_parsed(eid)
+            if game is not None:
+                _cache_put(game)
+                return game
+
+        # Only one process at a time downloads and saves a given game that
+        # has kicked off. The others wait here and then find it on disk, or
+        # give up if it couldn't be downloaded. The lock is released by
+        # __init__ once the game has been saved. (Games that haven't kicked
+        # off can't be saved, so there's nothing to wait for.)
+        lock = None
+        if eid is not None and fpath is None and not _is_cached(eid) \
+                and _has_kicked_off(eid):
+            lock = _lock_download(eid)
+            if _download_failed(lock):
+                _unlock(lock)
+                return None
+        game = _new_from_json(cls, eid, fpath)
+        if game is None:
+            _unlock(lock, failed=True)
+        elif game._initialized:
+            _unlock(lock)
+        else:
+            game._download_lock = lock
         return game
 
     def __init__(self, eid=None, fpath=None):
@@ -261,40 +540,18 @@ class Game (object):
         read it from disk.
 
         When the JSON data is written to disk, it is compressed using gzip.
+        (See `nflgame.game.background_saves`.)
         """
+        # Games from the parsed cache are already fully built.
+        if self._initialized:
+            return
+
         # Make the schedule info more accessible.
         self.schedule = nflgame.sched.games.get(self.eid, None)
-
-        # Home and team cumulative statistics.
-        self.home = self.data['home']['abbr']
-        self.away = self.data['away']['abbr']
-        self.stats_home = _json_team_stats(self.data['home']['stats']['team'])
-        self.stats_away = _json_team_stats(self.data['away']['stats']['team'])
-
-        # Load up some simple static values.
         self.gamekey = nflgame.sched.games[self.eid]['gamekey']
-        self.time = GameClock(self.data['qtr'], self.data['clock'])
-        self.down = _tryint(self.data['down'])
-        self.togo = _tryint(self.data['togo'])
-        self.score_home = int(self.data['home']['score']['T'])
-        self.score_away = int(self.data['away']['score']['T'])
-        for q in (1, 2, 3, 4, 5):
-            for team in ('home', 'away'):
-                score = self.data[team]['score'][str(q)]
-                self.__dict__['score_%s_q%d' % (team, q)] = int(score)
-
-        if not self.game_over():
-            self.winner = None
-        else:
-            if self.score_home > self.score_away:
-                self.winner = self.home
-                self.loser = self.away
-            elif self.score_away > self.score_home:
-                self.winner = self.away
-                self.loser = self.home
-            else:
-                self.winner = '%s/%s' % (self.home, self.away)
-                self.loser = '%s/%s' % (self.home, self.away)
+
+        # Teams, score, game clock and team statistics.
+        _json_scoreboard(self, self.data)
 
         # Load the scoring summary into a simple list of strings.
         self.scores = []
@@ -304,51 +561,60 @@ class Game (object):
                 % (play['team'], play['qtr'], play['type'], play['desc'])
             self.scores.append(s)
 
-        # Check to see if the game is over, and if so, cache the data.
-        if self.game_over() and not os.access(_jsonf % eid, os.R_OK):
-            self.save()
+        self._initialized = True
 
-    def is_home(self, team):
-        """Returns true if team (i.e., 'NE') is the home team."""
-        return team == self.home
-
-    def season(self):
-        """Returns the year of the season this game belongs to."""
-        year = int(self.eid[0:4])
-        month = int(self.eid[4:6])
-        if month <= 3:
-            year -= 1
-        return year
-
-    def game_over(self):
-        """game_over returns true if the game is no longer being played."""
-        return self.time.is_final()
-
-    def playing(self):
-        """playing returns true if the game is currently being played."""
-        return not self.time.is_pregame() and not self.time.is_final()
+        # Check to see if the game is over, and if so, cache the data.
+        lock = self.__dict__.pop('_download_lock', None)
+        if self.game_over() and not _is_cached(self.eid):
+            if background_saves:
+                _save_later(self, lock)
+                lock = None
+            else:
+                self.save()
+        if self.game_over() and parsed_cache_dir is not None:
+            _save_parsed(self)
+        if self.game_over():
+            with _downloads_lock:
+                _downloads.pop(self.eid, None)
+        _unlock(lock)
+        _cache_put(self)
+        self._drop_raw_data()
 
     def save(self, fpath=None):
         """
         Save the JSON data to fpath. This is done automatically if the
         game is over.
+
+        If fpath is None, the game is saved in `nflgame.game.cache_dir`
+        if it is set, or in the `gamecenter-json` directory otherwise.
+        If the game is over, its result is then also added to the results
+        table. (See `nflgame.results`.)
         """
+        to_cache = fpath is None and cache_dir is not None
+        to_table = fpath is None and self.game_over()
         if fpath is None:
-            fpath = _jsonf % self.eid
+            if to_cache:
+                fpath = _cache_path(self.eid)
+            else:
+                fpath = _jsonf % self.eid
         try:
-            print >> gzip.open(fpath, 'w+'), self.rawData,
-        except IOError:
+            if to_cache and not path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            _write_gzip(fpath, self.rawData)
+        except (IOError, OSError):
             print >> sys.stderr, "Could not cache JSON data. Please " \
-                                 "make '%s' writable." \
+                                 "make '%s' writable or set " \
+                                 "NFLGAME_CACHE_DIR." \
                                  % os.path.dirname(fpath)
-
-    def nice_score(self):
-        """
-        Returns a string of the score of the game.
-        e.g., "NE (32) vs. NYG (0)".
-        """
-        return '%s (%d) at %s (%d)' \
-               % (self.away, self.score_away, self.home, self.score_home)
+            return
+        if to_cache:
+            _evict_cache()
+        if to_table:
+            try:
+                nflgame.results.add(self, cache_dir if to_cache else None)
+            except (IOError, OSError) as e:
+                print >> sys.stderr, \
+                    'Could not update the results table: %s' % e
 
     def max_player_stats(self):
         """
@@ -377,11 +643,7 @@ class Game (object):
             newp = nflgame.player.GamePlayerStats(pplay.playerid,
                                                   pplay.name, pplay.home,
                                                   pplay.team)
-            maxstats = {}
-            for stat, val in pplay._stats.iteritems():
-                maxstats[stat] = val
-
-            newp._overwrite_stats(maxstats)
+            newp._vals = list(pplay._vals)
             max_players[pplay.playerid] = newp
 
         for newp in max_players.itervalues():
@@ -389,31 +651,82 @@ class Game (object):
                 if pgame.playerid != newp.playerid:
                     continue
 
-                maxstats = {}
-                for stat, val in pgame._stats.iteritems():
-                    maxstats[stat] = max([val,
-                                          newp._stats.get(stat, -_MAX_INT)])
+                maxstats, stats = {}, newp.stats
+                for stat, val in pgame.stats.iteritems():
+                    maxstats[stat] = max([val, stats.get(stat, -_MAX_INT)])
 
                 newp._overwrite_stats(maxstats)
                 break
         return nflgame.seq.GenPlayerStats(max_players)
 
     def __getattr__(self, name):
+        # The raw JSON of finished games isn't kept in the parsed cache,
+        # so reload it from disk if it's needed.
+        if name == 'rawData':
+            self.rawData = _get_json_data(self.eid)
+            if self.rawData is None:
+                raise AttributeError
+            return self.rawData
+        if name == 'data':
+            self.data = nflgame.jsonlib.loads(self.rawData)[self.eid]
+            return self.data
+        if name in ('players', 'drives') and '_parsed_body' in self.__dict__:
+            _load_parsed_body(self)
+            return getattr(self, name)
         if name == 'players':
             self.__players = _json_game_player_stats(self, self.data)
             self.players = nflgame.seq.GenPlayerStats(self.__players)
+            self._drop_raw_data()
             return self.players
         if name == 'drives':
             self.__drives = _json_drives(self, self.home, self.data['drives'])
             self.drives = nflgame.seq.GenDrives(self.__drives)
+            self._drop_raw_data()
             return self.drives
         raise AttributeError
 
+    def _build_all(self):
+        """
+        Builds the player statistics and drives of this game, along with
+        every play and its events and players, which are otherwise built
+        when first accessed.
+        """
+        for play in self.drives.plays():
+            play.events, play.players
+        self.players
+
+    def _drop_raw_data(self):
+        """
+        In lean mode, discards the raw JSON data of this game if it can be
+        read back from disk and is no longer needed.
+        (See `nflgame.game.lean`.)
+        """
+        if not lean or not self.game_over() or not _is_cached(self.eid):
+            return
+        self.__dict__.pop('rawData', None)
+        if 'players' in self.__dict__ and 'drives' in self.__dict__:
+            self.__dict__.pop('data', None)
+
     def __sub__(self, other):
         return diff(other, self)
 
-    def __str__(self):
-        return self.nice_score()
+    def __reduce__(self):
+        # Bypass __new__ when unpickling, since it loads JSON data.
+        # The raw JSON data of a finished game can be read back from disk,
+        # so leave it out.
+        state = dict(self.__dict__)
+        if self.game_over():
+            state.pop('rawData', None)
+            state.pop('data', None)
+        return (_new_game, (self.__class__,), state)
+
+
+def _new_game(cls):
+    """
+    Returns an uninitialized instance of cls, which should be Game or a
+    subclass of it. This is used when unpickling games.
+    """
+    return object.__new__(cls)
 
 
 def diff(before, after):
@@ -466,7 +779,16 @@ class Drive (object):
     and stop times and field position, length of possession, the number
     of first downs and a short descriptive string of the result of the
     drive.
+
+    The plays of a drive are only built when they are first accessed.
     """
+    __slots__ = ('game', 'drive_num', 'team', 'home', 'first_downs',
+                 'result', 'penalty_yds', 'total_yds', 'pos_time', 'play_cnt',
+                 'field_start', 'field_end', 'time_start', 'time_end',
+                 '_plays_data', '__plays', 'plays')
+    __getstate__ = _get_slots
+    __setstate__ = _set_slots
+
     def __init__(self, game, drive_num, home_team, data):
         if data is None or 'plays' not in data or len(data['plays']) == 0:
             return
@@ -517,8 +839,17 @@ class Drive (object):
                 and self.time_end.quarter in (1, 3):
             self.time_end.quarter += 1
 
-        self.__plays = _json_plays(self, data['plays'])
-        self.plays = nflgame.seq.GenPlays(self.__plays)
+        self._plays_data = data['plays']
+        if lean:
+            self.plays
+
+    def __getattr__(self, name):
+        if name in ('plays', '_Drive__plays'):
+            self.__plays = _json_plays(self, self._plays_data)
+            self.plays = nflgame.seq.GenPlays(self.__plays)
+            self._plays_data = None
+            return getattr(self, name)
+        raise AttributeError(name)
 
     def __add__(self, other):
         """
@@ -540,6 +871,7 @@ class Drive (object):
         new_drive.pos_time = self.pos_time + other.pos_time
         new_drive.play_cnt = self.play_cnt + other.play_cnt
         new_drive.__plays = self.__plays + other.__plays
+        new_drive.plays = nflgame.seq.GenPlays(new_drive.__plays)
         new_drive.result = None
         new_drive.field_start = None
         new_drive.field_end = None
@@ -560,10 +892,25 @@ class Play (object):
     is, field position, clock time, etc.
 
     Play objects also contain team-level statistics, such as whether the
-    play was a first down, a fourth down failure, etc.
+    play was a first down, a fourth down failure, etc. These and the
+    statistics of every player in the play are available as attributes
+    (e.g., `play.rushing_yds`) and in the `_stats` dictionary. Statistics
+    that a play doesn't have are zero.
+
+    The events, players and statistics of a play are only built when they
+    are first accessed.
     """
+    __slots__ = ('data', '_yrdln', 'drive', 'playid', 'team', 'home', 'desc',
+                 'note', 'down', 'yards_togo', 'touchdown', '_stats', 'time',
+                 'yardline', '_players_data', 'events', '__players',
+                 'players')
+    __getstate__ = _get_slots
+    __setstate__ = _set_slots
+
     def __init__(self, drive, playid, data):
-        self.data = data
+        if not lean:
+            self.data = data
+        self._yrdln = data['yrdln']
         self.drive = drive
         self.playid = playid
         self.team = data['posteam']
@@ -573,7 +920,7 @@ class Play (object):
         self.down = int(data['down'])
         self.yards_togo = int(data['ydstogo'])
         self.touchdown = 'touchdown' in self.desc.lower()
-        self._stats = {}
+        self._players_data = data['players']
 
         if not self.team:
             self.time, self.yardline = None, None
@@ -581,36 +928,46 @@ class Play (object):
             self.time = GameClock(data['qtr'], data['time'])
             self.yardline = FieldPosition(self.team, data['yrdln'])
 
+    def _load_players(self):
+        """
+        Builds the players of this play along with its statistics.
+        """
+        data = self._players_data
+        self._stats = {}
+
         # Load team statistics directly into the Play instance.
         # Things like third down attempts, first downs, etc.
-        if '0' in data['players']:
-            for info in data['players']['0']:
-                if info['statId'] not in nflgame.statmap.idmap:
+        if '0' in data:
+            stats = self._stats
+            for info in data['0']:
+                stat = nflgame.statmap.table.get(info['statId'])
+                if stat is None:
                     continue
-                statvals = nflgame.statmap.values(info['statId'],
-                                                  info['yards'])
-                for k, v in statvals.iteritems():
-                    v = self.__dict__.get(k, 0) + v
-                    self.__dict__[k] = v
-                    self._stats[k] = v
-
-        # Load the sequence of "events" in a play into a list of dictionaries.
-        self.events = _json_play_events(data['players'])
+                _, names, _, yds_name, value, _ = stat
+                if yds_name is not None:
+                    yards = nflgame.statmap.to_yards(info['yards'])
+                    stats[yds_name] = stats.get(yds_name, 0) + yards
+                for k in names:
+                    stats[k] = stats.get(k, 0) + value
 
         # Now load cumulative player data for this play into
         # a GenPlayerStats generator. We then flatten this data
         # and add it to the play itself so that plays can be
         # filter by these statistics.
-        self.__players = _json_play_players(self, data['players'])
+        self.__players = _json_play_players(self, data)
         self.players = nflgame.seq.GenPlayerStats(self.__players)
         for p in self.players:
-            for k, v in p.stats.iteritems():
-                # Sometimes we may see duplicate statistics (like tackle
-                # assists). Let's just overwrite in this case, since this
-                # data is from the perspective of the play. i.e., there
-                # is one assisted tackle rather than two.
-                self.__dict__[k] = v
-                self._stats[k] = v
+            # Sometimes we may see duplicate statistics (like tackle
+            # assists). Let's just overwrite in this case, since this
+            # data is from the perspective of the play. i.e., there
+            # is one assisted tackle rather than two.
+            for i, v in enumerate(p._vals):
+                if v is not None:
+                    self._stats[nflgame.statmap.field_names[i]] = v
+
+        # The raw JSON isn't needed anymore once the events are built too.
+        if _has_slot(self, 'events'):
+            self._players_data = None
 
     def has_player(self, playerid):
         """Whether a player with id playerid participated in this play."""
@@ -620,11 +977,11 @@ class Play (object):
         if self.team:
             if self.down != 0:
                 return '(%s, %s, Q%d, %d and %d) %s' \
-                       % (self.team, self.data['yrdln'], self.time.qtr,
+                       % (self.team, self._yrdln, self.time.qtr,
                           self.down, self.yards_togo, self.desc)
             else:
                 return '(%s, %s, Q%d) %s' \
-                       % (self.team, self.data['yrdln'], self.time.qtr,
+                       % (self.team, self._yrdln, self.time.qtr,
                           self.desc)
         return self.desc
 
@@ -636,9 +993,61 @@ class Play (object):
         return self.playid == other.playid and self.desc == other.desc
 
     def __getattr__(self, name):
-        if name.startswith('__'):
-            raise AttributeError
-        return 0
+        if name == 'events':
+            # Load the sequence of "events" in a play into a list of
+            # dictionaries.
+            self.events = _json_play_events(self._players_data)
+            if _has_slot(self, '_stats'):
+                self._players_data = None
+            return self.events
+        if name in ('_stats', 'players', '_Play__players'):
+            self._load_players()
+            return getattr(self, name)
+        # Play.data isn't kept in lean mode, and it's not a statistic.
+        if name.startswith('__') or name in ('data', '_players_data'):
+            raise AttributeError(name)
+        return self._stats.get(name, 0)
+
+
+def _json_scoreboard(game, data):
+    """
+    Sets the teams, score, game clock, winner and team statistics of
+    game (a `nflgame.game.GameSummary`) from its decoded JSON data.
+    """
+    game.home = data['home']['abbr']
+    game.away = data['away']['abbr']
+    game.stats_home = _json_team_stats(data['home']['stats']['team'])
+    game.stats_away = _json_team_stats(data['away']['stats']['team'])
+
+    game.time = GameClock(data['qtr'], data['clock'])
+    game.down = _tryint(data['down'])
+    game.togo = _tryint(data['togo'])
+    game.score_home = int(data['home']['score']['T'])
+    game.score_away = int(data['away']['score']['T'])
+    for q in (1, 2, 3, 4, 5):
+        for team in ('home', 'away'):
+            score = data[team]['score'][str(q)]
+            setattr(game, 'score_%s_q%d' % (team, q), int(score))
+    _set_winner(game)
+
+
+def _set_winner(game):
+    """
+    Sets the winner and loser of game (a `nflgame.game.GameSummary`)
+    from its score, if it's over.
+    """
+    if not game.game_over():
+        game.winner = None
+    else:
+        if game.score_home > game.score_away:
+            game.winner = game.home
+            game.loser = game.away
+        elif game.score_away > game.score_home:
+            game.winner = game.away
+            game.loser = game.home
+        else:
+            game.winner = '%s/%s' % (game.home, game.away)
+            game.loser = '%s/%s' % (game.home, game.away)
 
 
 def _json_team_stats(data):
@@ -708,11 +1117,13 @@ def _json_play_players(play, data):
     to determine whether the player belong to the home team or not.
     """
     players = OrderedDict()
+    table, to_yards = nflgame.statmap.table, nflgame.statmap.to_yards
     for playerid, statcats in data.iteritems():
         if playerid == '0':
             continue
         for info in statcats:
-            if info['statId'] not in nflgame.statmap.idmap:
+            stat = table.get(info['statId'])
+            if stat is None:
                 continue
             if playerid not in players:
                 home = play.drive.game.is_home(info['clubcode'])
@@ -724,8 +1135,7 @@ def _json_play_players(play, data):
                                                        info['playerName'],
                                                        home, team_name)
                 players[playerid] = stats
-            statvals = nflgame.statmap.values(info['statId'], info['yards'])
-            players[playerid]._add_stats(statvals)
+            players[playerid]._add_event(stat, to_yards(info['yards']))
     return players
 
 
@@ -734,11 +1144,18 @@ def _json_play_events(data):
     Takes a single JSON play entry (data) and converts it to a list of events.
     """
     temp = list()
+    table, to_yards = nflgame.statmap.table, nflgame.statmap.to_yards
     for playerid, statcats in data.iteritems():
         for info in statcats:
-            if info['statId'] not in nflgame.statmap.idmap:
+            stat = table.get(info['statId'])
+            if stat is None:
                 continue
-            statvals = nflgame.statmap.values(info['statId'], info['yards'])
+            _, names, _, yds_name, value, _ = stat
+            statvals = {}
+            for k in names:
+                statvals[k] = value
+            if yds_name is not None:
+                statvals[yds_name] = to_yards(info['yards'])
             statvals['playerid'] = None if playerid == '0' else playerid
             statvals['playername'] = info['playerName'] or None
             statvals['team'] = info['clubcode']
@@ -777,11 +1194,51 @@ def _json_game_player_stats(game, data):
     return players
 
 
+def _new_from_json(cls, eid, fpath):
+    """
+    Creates a new, uninitialized Game from the JSON data for the game
+    represented by eid (or in the file at fpath). If the game was
+    downloaded before and hasn't changed since, the existing Game is
+    returned instead. If there is no valid JSON data, None is returned.
+    """
+    # If we can't get a valid JSON data, exit out and return None.
+    rawData = _get_json_data(eid, fpath)
+    if rawData is None or rawData.strip() == '{}':
+        return None
+    if eid is not None:
+        game = _unchanged_download(eid, rawData)
+        if game is not None:
+            return game
+    game = object.__new__(cls)
+    game.rawData = rawData
+
+    try:
+        if eid is not None:
+            game.eid = eid
+            game.data = nflgame.jsonlib.loads(game.rawData)[game.eid]
+        else:  # For when we have rawData (fpath) and no eid.
+            game.eid = None
+            game.data = nflgame.jsonlib.loads(game.rawData)
+            for k, v in game.data.iteritems():
+                if isinstance(v, dict):
+                    game.eid = k
+                    game.data = v
+                    break
+            assert game.eid is not None
+    except ValueError:
+        return None
+
+    _remember_download(game, rawData)
+    return game
+
+
 def _get_json_data(eid=None, fpath=None):
     """
     Returns the JSON data corresponding to the game represented by eid.
 
-    If the JSON data is already on disk, it is read, decompressed and returned.
+    If the JSON data is already on disk, either in a season archive (see
+    `nflgame.archive`) or in its own file, it is read, decompressed and
+    returned.
 
     Otherwise, the JSON data is downloaded from the NFL web site. If the data
     doesn't exist yet or there was an error, _get_json_data returns None.
@@ -793,18 +1250,545 @@ def _get_json_data(eid=None, fpath=None):
     if fpath is not None:
         return gzip.open(fpath).read()
 
+    data = nflgame.archive.read(eid)
+    if data is not None:
+        return data
+    fpath = _json_path(eid)
+    if fpath is not None:
+        data = gzip.open(fpath).read()
+        if fpath != _jsonf % eid:
+            _touch(fpath)
+        return data
+    return _download(eid)
+
+
+def flush_saves():
+    """
+    Blocks until every game queued to be saved in the background has been
+    written to disk. (See `nflgame.game.background_saves`.)
+    """
+    if _saver_pid == os.getpid():
+        _save_queue.join()
+
+
+def _save_later(game, lock):
+    """
+    Queues game to be saved by the background writer, which releases its
+    download lock afterwards. The writer is started if it isn't running
+    in this process.
+    """
+    global _save_queue, _saver_pid
+
+    with _saver_lock:
+        if _saver_pid != os.getpid():
+            _save_queue = Queue.Queue()
+            t = threading.Thread(target=_run_saver, args=(_save_queue,))
+            t.daemon = True
+            t.start()
+            _saver_pid = os.getpid()
+        _save_queue.put((game, lock))
+
+
+def _run_saver(queue):
+    while True:
+        game, lock = queue.get()
+        try:
+            game.save()
+        except Exception as e:
+            print >> sys.stderr, 'Could not save game %s: %s' % (game.eid, e)
+        finally:
+            _unlock(lock)
+            queue.task_done()
+
+
+def _write_gzip(fpath, data):
+    """
+    Writes data gzipped to fpath. The file is replaced atomically, so
+    readers never see a partially written file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.dirname(fpath) or '.',
+                               prefix='.game-')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            gz = gzip.GzipFile(fpath, 'wb', fileobj=fp)
+            gz.write(data)
+            gz.close()
+        os.chmod(tmp, 0o644)
+        os.rename(tmp, fpath)
+    except:
+        os.remove(tmp)
+        raise
+
+
+def _lock_download(eid):
+    """
+    Blocks until this process holds the lock on downloading and saving
+    the game represented by eid, and returns the open lock file. The lock
+    is a file next to where the game would be saved and is shared with
+    other processes.
+
+    None is returned when locking isn't possible, e.g., in offline mode,
+    when that directory isn't writable or without fcntl.
+    """
+    if offline or fcntl is None:
+        return None
+    dpath = cache_dir if cache_dir is not None else path.dirname(_jsonf)
+    try:
+        if not path.isdir(dpath):
+            os.makedirs(dpath)
+        fp = open(path.join(dpath, '.%s.lock' % eid), 'a')
+    except (IOError, OSError):
+        return None
+    fcntl.flock(fp.fileno(), fcntl.LOCK_EX)
+    return fp
+
+
+def _unlock(lock, failed=False):
+    """
+    Releases a lock returned by _lock_download. The lock file is removed
+    first. A process that was waiting on it still gets the lock and then
+    finds the game on disk, while new processes create a new lock file.
+
+    If failed is true, the game couldn't be downloaded. This is written to
+    the (removed) lock file, so that processes that were waiting on it
+    give up instead of trying again one after another. See
+    _download_failed.
+
+    The lock is released explicitly rather than by closing the file,
+    since processes forked while it was held share it and would keep it
+    locked.
+    """
+    if lock is None:
+        return
+    try:
+        os.remove(lock.name)
+    except OSError:
+        pass
+    if failed:
+        lock.write('failed\n')
+        lock.flush()
+    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+    lock.close()
+
+
+def _download_failed(lock):
+    """
+    Returns true if the process that held lock (returned by
+    _lock_download) before this one couldn't download the game.
+    """
+    return lock is not None and os.fstat(lock.fileno()).st_size > 0
+
+
+def _json_path(eid):
+    """
+    Returns the path of the gzipped JSON file for the game represented by
+    eid, which is either in the `gamecenter-json` directory or in
+    `cache_dir`. If there is no such file, None is returned.
+    """
     fpath = _jsonf % eid
     if os.access(fpath, os.R_OK):
-        return gzip.open(fpath).read()
+        return fpath
+    if cache_dir is not None:
+        fpath = _cache_path(eid)
+        if os.access(fpath, os.R_OK):
+            return fpath
+    return None
+
+
+def _cache_path(eid):
+    """
+    Returns the path in `cache_dir` for the game represented by eid.
+    """
+    return path.join(cache_dir, '%s.json.gz' % eid)
+
+
+def _touch(fpath):
+    """
+    Marks the game file at fpath in `cache_dir` as just used by updating
+    its access time. (Its modification time is left alone since it is part
+    of the key of the parsed cache.)
+    """
     try:
-        return urllib2.urlopen(_json_base_url % (eid, eid), timeout=5).read()
-    except urllib2.HTTPError:
-        pass
-    except socket.timeout:
+        os.utime(fpath, (time.time(), os.stat(fpath).st_mtime))
+    except OSError:
         pass
+
+
+def _evict_cache():
+    """
+    Removes the least recently used games from `cache_dir` until their
+    total size is no more than `cache_max_size`.
+    """
+    if cache_max_size is None:
+        return
+    files, total = [], 0
+    for fpath in glob.glob(path.join(cache_dir, '*.json.gz')):
+        try:
+            st = os.stat(fpath)
+        except OSError:
+            continue
+        files.append((st.st_atime, st.st_size, fpath))
+        total += st.st_size
+    for _, size, fpath in sorted(files):
+        if total <= cache_max_size:
+            break
+        try:
+            os.remove(fpath)
+        except OSError:
+            continue
+        total -= size
+
+
+def _download(eid):
+    """
+    Downloads the JSON data for the game represented by eid from NFL.com.
+    If the data doesn't exist yet or there was an error, None is returned.
+
+    If the game was downloaded before, the request is conditional on its
+    data having changed since. If it hasn't changed, the very same rawData
+    string as last time is returned.
+
+    Nothing is downloaded in offline mode, or if NFL.com reported that the
+    game doesn't exist less than `nflgame.game.unavailable_ttl` seconds
+    ago.
+    """
+    if offline:
+        return None
+    with _downloads_lock:
+        if _unavailable.get(eid, 0) > time.time():
+            return None
+        prev = _downloads.get(eid)
+    headers = {}
+    if prev is not None:
+        etag, modified = prev[0], prev[1]
+        if etag is not None:
+            headers['If-None-Match'] = etag
+        if modified is not None:
+            headers['If-Modified-Since'] = modified
+    try:
+        resp, content = _http_client().request(_json_base_url % (eid, eid),
+                                               headers=headers)
+    except (socket.error, httplib2.HttpLib2Error):
+        return None
+    if resp.status == 304 and prev is not None:
+        return prev[2]
+    if resp.status != 200:
+        # Only remember that the game doesn't exist (yet). Other errors
+        # are usually transient, and a live game must not be hidden by
+        # one of them.
+        if resp.status == 404:
+            _mark_unavailable(eid)
+        return None
+
+    etag, modified = resp.get('etag'), resp.get('last-modified')
+    with _downloads_lock:
+        _unavailable.pop(eid, None)
+        if etag is not None or modified is not None:
+            _downloads[eid] = (etag, modified, content, None)
+    return content
+
+
+def _mark_unavailable(eid):
+    """
+    Records that the game represented by eid doesn't exist on NFL.com.
+    """
+    if unavailable_ttl > 0:
+        with _downloads_lock:
+            _unavailable[eid] = time.time() + unavailable_ttl
+
+
+def _http_client():
+    """
+    Returns the HTTP client of the current thread.
+    """
+    if getattr(_http, 'client', None) is None:
+        _http.client = httplib2.Http(timeout=5)
+    return _http.client
+
+
+def _unchanged_download(eid, rawData):
+    """
+    Returns the Game that was built the last time the game represented by
+    eid was downloaded, if rawData is the unchanged data returned by
+    _download. Otherwise, None is returned.
+    """
+    with _downloads_lock:
+        prev = _downloads.get(eid)
+    if prev is not None and prev[2] is rawData:
+        return prev[3]
     return None
 
 
+def _remember_download(game, rawData):
+    """
+    Associates game with its downloaded rawData, so that it can be returned
+    again while its data on NFL.com doesn't change.
+    """
+    with _downloads_lock:
+        prev = _downloads.get(game.eid)
+        if prev is not None and prev[2] is rawData:
+            _downloads[game.eid] = prev[:3] + (game,)
+
+
+def _is_cached(eid):
+    """
+    Returns true if the JSON data for the game represented by eid is
+    available on disk.
+    """
+    return nflgame.archive.contains(eid) or _json_path(eid) is not None
+
+
+def _has_kicked_off(eid):
+    """
+    Returns true if the schedule says that the game represented by eid
+    has kicked off. Games that aren't in the schedule are assumed to have
+    kicked off.
+
+    Without pytz, only games from before today (in UTC) have kicked off.
+    """
+    info = nflgame.sched.games.get(eid, None)
+    if info is None:
+        return True
+    if not hasattr(nflgame.sched, 'pytz'):
+        return eid[:8] < time.strftime('%Y%m%d', time.gmtime())
+    return nflgame.sched._get_index().kickoff(info) <= time.time()
+
+
+def summary(eid):
+    """
+    Returns a `nflgame.game.GameSummary` of the game with GSIS id eid,
+    or None if there is no data for it.
+
+    Finished games are looked up in the results table first. (See
+    `nflgame.results`.) If the game isn't there but is already in memory
+    (see `nflgame.game.game_cache_size`), its scoreboard is copied from
+    it. Otherwise, if its JSON data is on disk, only the scoreboard is
+    read from it and no Game is built. If it isn't on disk either, the
+    game is loaded with `nflgame.game.Game`, which downloads it (and
+    saves it if it's over).
+
+    Summaries of finished games are kept in memory, so asking for one
+    again costs nothing.
+    """
+    s = _summaries.get(eid)
+    if s is not None:
+        return s
+
+    s = nflgame.results.get(eid)
+    if s is None:
+        s = _new_summary(eid)
+        if s is None:
+            return None
+    if s.game_over():
+        _summaries[eid] = s
+    return s
+
+
+def _new_summary(eid):
+    """
+    Returns a new `nflgame.game.GameSummary` of the game with GSIS id
+    eid, made from the Game in memory or from its JSON data, or None if
+    there is no data for it.
+    """
+    game = _cache_get(eid)
+    if game is None and _is_cached(eid):
+        try:
+            data = nflgame.jsonlib.loads(_get_json_data(eid))[eid]
+        except (ValueError, KeyError):
+            return None
+        return GameSummary(eid, data)
+    if game is None:
+        game = Game(eid)
+        if game is None:
+            return None
+    s = object.__new__(GameSummary)
+    for name in GameSummary._fields:
+        setattr(s, name, getattr(game, name))
+    return s
+
+
+def clear_game_cache():
+    """
+    Removes every game from the in-memory cache of finished games.
+    (See `nflgame.game.game_cache_size`.)
+    """
+    with _game_cache_lock:
+        _game_cache.clear()
+
+
+def _cache_get(eid):
+    """
+    Returns the game represented by eid from the in-memory cache and
+    marks it as most recently used. If it isn't there, None is returned.
+    """
+    if game_cache_size <= 0:
+        return None
+    with _game_cache_lock:
+        game = _game_cache.pop(eid, None)
+        if game is not None:
+            _game_cache[eid] = game
+    return game
+
+
+def _cache_put(game):
+    """
+    Adds game to the in-memory cache if it is finished, evicting the
+    least recently used games if the cache is full.
+    """
+    if game_cache_size <= 0 or game.eid is None or not game.game_over():
+        return
+    with _game_cache_lock:
+        _game_cache.pop(game.eid, None)
+        _game_cache[game.eid] = game
+        while len(_game_cache) > game_cache_size:
+            _game_cache.popitem(last=False)
+
+
+def _data_version(eid):
+    """
+    Returns a string that identifies the version of the JSON data for
+    the game represented by eid that is stored on disk. If the data isn't
+    on disk, None is returned.
+    """
+    info = nflgame.archive.info(eid)
+    if info is not None:
+        return 'zip:%d:%08x' % (info.file_size, info.CRC)
+    fpath = _json_path(eid)
+    if fpath is None:
+        return None
+    try:
+        st = os.stat(fpath)
+    except OSError:
+        return None
+    return 'gz:%d:%d' % (st.st_size, int(st.st_mtime))
+
+
+def _parsed_path(eid):
+    """
+    Returns the path in the parsed cache for the game represented by eid,
+    or None if the game's JSON data is not on disk.
+    """
+    version = _data_version(eid)
+    if version is None:
+        return None
+    key = '%s|%d|%s' % (__version__, _PARSED_CACHE_VERSION, version)
+    name = '%s-%s.pickle' % (eid, hashlib.sha1(key).hexdigest()[:16])
+    return path.join(parsed_cache_dir, name)
+
+
+def _needs_parsing(eid):
+    """
+    Returns true if the JSON data for the game represented by eid is on
+    disk, but the game isn't in the parsed cache.
+    """
+    fpath = _parsed_path(eid)
+    return fpath is not None and not path.exists(fpath)
+
+
+_PARSED_BODY = ('players', 'drives', '_Game__players', '_Game__drives')
+"""
+The attributes of a Game that make up the body of a parsed cache entry.
+Everything else (except for the raw JSON data) is in the header.
+"""
+
+
+def _load_parsed(eid):
+    """
+    Returns the game represented by eid from the parsed cache, or None
+    if it isn't there (or is unreadable).
+
+    Only the header of the cache entry is read here. The drives, plays
+    and player statistics are read by `_load_parsed_body` the first time
+    they are accessed.
+    """
+    fpath = _parsed_path(eid)
+    if fpath is None:
+        return None
+    try:
+        with open(fpath, 'rb') as fp:
+            header = cPickle.load(fp)
+            offset = fp.tell()
+    except IOError:
+        return None
+    except Exception:
+        # A corrupt or incompatible entry is simply rebuilt.
+        return None
+    game = object.__new__(Game)
+    game.__dict__.update(header)
+    game.schedule = nflgame.sched.games.get(eid, None)
+    game._parsed_body = (fpath, offset)
+    return game
+
+
+def _load_parsed_body(game):
+    """
+    Reads the drives, plays and player statistics of game from the body
+    of its parsed cache entry. If that fails, they are built from the JSON
+    data as usual when next accessed.
+    """
+    fpath, offset = game._parsed_body
+    del game._parsed_body
+
+    # Unpickling creates a lot of objects, which otherwise triggers many
+    # pointless garbage collection passes.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(fpath, 'rb') as fp:
+            fp.seek(offset)
+            unpickler = cPickle.Unpickler(fp)
+            unpickler.persistent_load = lambda pid: game
+            body = unpickler.load()
+    except Exception:
+        return
+    finally:
+        if gc_enabled:
+            gc.enable()
+    game.__dict__.update(body)
+
+
+def _save_parsed(game):
+    """
+    Builds all of the drives, plays and player statistics of game and
+    writes it to the parsed cache, replacing any stale entries for the
+    same game. Errors are ignored, since the cache is only an
+    optimization.
+
+    An entry consists of two pickles: a header with the game's simple
+    attributes and a body with its drives and player statistics.
+    References from the body back to the game itself are stored as
+    persistent ids so that the game is not pickled twice.
+    """
+    fpath = _parsed_path(game.eid)
+    if fpath is None:
+        return
+    game._build_all()
+
+    header, body = {}, {}
+    for k, v in game.__dict__.iteritems():
+        if k in _PARSED_BODY:
+            body[k] = v
+        elif k not in ('rawData', 'data'):
+            header[k] = v
+    try:
+        fd, tmp = tempfile.mkstemp(dir=parsed_cache_dir, prefix='.parsed-')
+        with os.fdopen(fd, 'wb') as fp:
+            cPickle.dump(header, fp, cPickle.HIGHEST_PROTOCOL)
+            pickler = cPickle.Pickler(fp, cPickle.HIGHEST_PROTOCOL)
+            pickler.persistent_id = \
+                lambda obj: 'game' if obj is game else None
+            pickler.dump(body)
+        os.rename(tmp, fpath)
+    except (IOError, OSError, cPickle.PicklingError):
+        return
+    for stale in glob.glob(path.join(parsed_cache_dir, '%s-*' % game.eid)):
+        if stale != fpath:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
 def _tryint(v):
     """
     Tries to convert v to an integer. If it fails, return 0.
@@ -813,3 +1797,5 @@ def _tryint(v):
         return int(v)
     except:
         return 0
+
+atexit.register(flush_saves)
@@ -0,0 +1,81 @@
+"""
+The jsonlib module picks the JSON decoder that nflgame uses to read
+game, schedule and player data.
+
+By default, the fastest installed decoder among ujson, rapidjson and
+simplejson (only when its C speedups are available) is used. If none of
+them are installed, the standard library's json module is used. A
+specific decoder can be chosen with `nflgame.jsonlib.set_decoder`, or by
+setting the NFLGAME_JSON environment variable to the name of one of the
+modules above (or "json") before nflgame is imported.
+
+Only decoding is affected. nflgame always writes JSON with the standard
+library's json module.
+"""
+import json
+import os
+
+_candidates = ('ujson', 'rapidjson', 'simplejson', 'json')
+"""
+The modules that are tried when detecting a decoder, fastest first.
+"""
+
+backend = None
+"""The name of the decoder currently in use."""
+
+_loads = None
+
+
+def loads(s):
+    """
+    Decodes the JSON string s with the decoder currently in use.
+    """
+    return _loads(s)
+
+
+def set_decoder(decoder=None):
+    """
+    Sets the JSON decoder used by nflgame.
+
+    decoder may be the name of a module in `_candidates`, or any callable
+    that takes a JSON string and returns the decoded value (in which case
+    the backend name is "custom"). If decoder is None, the fastest
+    installed decoder is detected.
+
+    A ValueError is raised if the named decoder is unknown or not
+    installed.
+    """
+    global backend, _loads
+
+    if callable(decoder):
+        backend, _loads = 'custom', decoder
+        return
+    names = _candidates if decoder is None else (decoder,)
+    for name in names:
+        if name not in _candidates:
+            raise ValueError('Unknown JSON decoder "%s".' % name)
+        fn = _import_loads(name)
+        if fn is not None:
+            backend, _loads = name, fn
+            return
+    raise ValueError('JSON decoder "%s" is not installed.' % decoder)
+
+
+def _import_loads(name):
+    """
+    Returns the loads function of the JSON module called name, or None
+    if it isn't usable.
+    """
+    if name == 'json':
+        return json.loads
+    try:
+        module = __import__(name)
+    except ImportError:
+        return None
+    if name == 'simplejson':
+        # Without its C extension, simplejson is slower than json.
+        if getattr(module.scanner, 'c_make_scanner', None) is None:
+            return None
+    return module.loads
+
+set_decoder(os.getenv('NFLGAME_JSON') or None)
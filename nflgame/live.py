@@ -39,6 +39,9 @@ the regular season, but the postseason brings new challenges. Moreover, it
 will probably affect the API at least a little bit.
 """
 import datetime
+import multiprocessing
+import multiprocessing.pool
+import sys
 import time
 import urllib2
 import xml.dom.minidom as xml
@@ -50,6 +53,7 @@ except ImportError:
 
 import nflgame
 import nflgame.game
+import nflgame.sched
 
 # [00:21] <rasher> burntsushi: Alright, the schedule changes on Wednesday 7:00
 # UTC during the regular season
@@ -70,6 +74,21 @@ How often to check what the current week is. By default, it is twice a day.
 # Pinged infrequently to discover the current week number, year and week type.
 # The actual schedule of games is taken from the schedule module.
 # """
+_FETCH_WORKERS = 8
+"""
+The maximum number of games that are fetched from NFL.com at the same time.
+"""
+
+_FETCH_DEADLINE = 10
+"""
+The number of seconds allowed for fetching all of the active games in one
+cycle. Games that haven't been fetched by then are skipped until the next
+cycle, so that they don't hold up updates for the other games.
+"""
+
+_fetch_pool = None
+"""The thread pool used to fetch games. It is created on first use."""
+
 _CUR_SCHEDULE = "http://www.nfl.com/liveupdate/scorestrip/postseason/ss.xml"
 
 """
@@ -141,14 +160,11 @@ def current_games(year=None, week=None, kind='REG'):
         year, week = current_year_and_week()
 
     guesses = []
-    now = _now()
-    games = _games_in_week(year, week, kind=kind)
-    for info in games:
-        gametime = _game_datetime(info)
-        if gametime >= now:
-            if (gametime - now).total_seconds() <= 60 * 15:
-                guesses.append(info['eid'])
-        elif (now - gametime).total_seconds() <= _MAX_GAME_TIME:
+    now = time.time()
+    index = nflgame.sched._get_index()
+    for info in index.kickoff_range(now - _MAX_GAME_TIME, now + 60 * 15):
+        if (info['year'], info['week'], info['season_type']) \
+                == (year, week, kind):
             guesses.append(info['eid'])
 
     # Now we have a list of all games that are currently playing, are
@@ -156,8 +172,7 @@ def current_games(year=None, week=None, kind='REG'):
     # for _MAX_GAME_TIME (6 hours?). Now fetch data for each of them and
     # rule out games in the last two categories.
     current = []
-    for guess in guesses:
-        game = nflgame.game.Game(guess)
+    for game in _fetch_games(guesses):
         if game is not None and game.playing():
             current.append(game)
     return current
@@ -201,9 +216,13 @@ def run(callback, active_interval=15, inactive_interval=900, stop=None):
     point, run will quit. (Technically, it's possible that it won't quit until
     at most inactive_interval seconds after the stopping point is reached.)
     The stop value is compared against datetime.datetime.now().
+
+    If the schedule is out of date, it is refreshed in the background
+    whenever the current week is checked.
     """
     active = False
     last_week_check = _update_week_number()
+    _refresh_schedule()
 
     # Before we start with the main loop, we make a first pass at what we
     # believe to be the active games. Of those, we check to see if any of
@@ -227,6 +246,7 @@ def run(callback, active_interval=15, inactive_interval=900, stop=None):
 
         if time.time() - last_week_check > _WEEK_INTERVAL:
             last_week_check = _update_week_number()
+            _refresh_schedule()
 
         games = _active_games(inactive_interval)
         if active:
@@ -241,6 +261,14 @@ def run(callback, active_interval=15, inactive_interval=900, stop=None):
             time.sleep(inactive_interval)
 
 
+def _refresh_schedule():
+    """
+    Starts a background refresh of the schedule if it is out of date.
+    """
+    if nflgame.sched.is_stale():
+        nflgame.sched.refresh(background=True)
+
+
 def _run_active(callback, games):
     """
     The active mode traverses each of the active games and fetches info for
@@ -261,9 +289,8 @@ def _run_active(callback, games):
         return False
 
     active, completed = [], []
-    for info in games:
-        game = nflgame.game.Game(info['eid'])
-
+    fetched = _fetch_games([info['eid'] for info in games])
+    for info, game in zip(games, fetched):
         # If no JSON was retrieved, then we're probably just a little early.
         # So just ignore it for now---but we'll keep trying!
         if game is None:
@@ -285,7 +312,10 @@ def _run_active(callback, games):
                 continue
             diffs.append(game - last_game)
 
-    _last = active
+    # Keep the previous version of games that weren't fetched this time
+    # around, so that their next diff is still against it.
+    fetched = set(game.eid for game in active + completed)
+    _last = active + [g for g in _last or [] if g.eid not in fetched]
     callback(active, completed, diffs)
     return True
 
@@ -327,6 +357,33 @@ def _games_in_week(year, week, kind='REG'):
     return nflgame._search_schedule(year, week, kind=kind)
 
 
+def _fetch_games(eids):
+    """
+    Fetches the games represented by eids concurrently and returns a list
+    of game.Game in the same order. An entry is None if the game has no
+    data yet, if fetching it failed or if it wasn't fetched within
+    _FETCH_DEADLINE seconds.
+    """
+    global _fetch_pool
+
+    if _fetch_pool is None:
+        _fetch_pool = multiprocessing.pool.ThreadPool(_FETCH_WORKERS)
+    results = [_fetch_pool.apply_async(nflgame.game.Game, (eid,))
+               for eid in eids]
+    deadline = time.time() + _FETCH_DEADLINE
+
+    games = []
+    for eid, result in zip(eids, results):
+        try:
+            games.append(result.get(max(0, deadline - time.time())))
+        except multiprocessing.TimeoutError:
+            games.append(None)
+        except Exception as e:
+            print >> sys.stderr, 'Could not fetch game %s: %s' % (eid, e)
+            games.append(None)
+    return games
+
+
 def _game_is_active(gameinfo, inactive_interval):
     """
     Returns true if the game is active. A game is considered active if the
@@ -334,18 +391,16 @@ def _game_is_active(gameinfo, inactive_interval):
     a private module level variable that is populated automatically) or if the
     game start time is within inactive_interval seconds from starting.
     """
-    gametime = _game_datetime(gameinfo)
-    now = _now()
-    if gametime >= now:
-        return (gametime - now).total_seconds() <= inactive_interval
+    kickoff = nflgame.sched._get_index().kickoff(gameinfo)
+    now = time.time()
+    if kickoff >= now:
+        return kickoff - now <= inactive_interval
     return gameinfo['eid'] not in _completed
 
 
 def _game_datetime(info):
-    hour, minute = info['time'].strip().split(':')
-    d = datetime.datetime(int(info['eid'][:4]), info['month'], info['day'],
-                          (int(hour) + 12) % 24, int(minute))
-    return pytz.timezone('US/Eastern').localize(d).astimezone(pytz.utc)
+    kickoff = nflgame.sched._get_index().kickoff(info)
+    return datetime.datetime.fromtimestamp(kickoff, pytz.utc)
 
 
 def _now():
@@ -1,26 +1,79 @@
 from __future__ import division
 
-import json
+import collections
+import hashlib
+import itertools
+import marshal
+import os
 import os.path
+import tempfile
+import threading
 from collections import OrderedDict
 
+import nflgame.jsonlib
 import nflgame.seq
 import nflgame.statmap
 
 _player_json_file = os.path.join(os.path.dirname(__file__), 'players.json')
 
+_COMPILED_VERSION = 2
+"""
+Bumped whenever the layout of the compiled player database changes, so
+that stale compiled files are rebuilt instead of misread.
+"""
+
+_record_fields = (
+    # (JSON key, Player attribute, default)
+    ('gsis_id', 'player_id', ''),
+    ('gsis_name', 'gsis_name', ''),
+    ('full_name', 'full_name', ''),
+    ('first_name', 'first_name', ''),
+    ('last_name', 'last_name', ''),
+    ('team', 'team', ''),
+    ('position', 'position', ''),
+    ('profile_id', 'profile_id', 0),
+    ('profile_url', 'profile_url', ''),
+    ('number', 'uniform_number', 0),
+    ('birthdate', 'birthdate', ''),
+    ('college', 'college', ''),
+    ('height', 'height', ''),
+    ('weight', 'weight', ''),
+    ('years_pro', 'years_pro', 0),
+    ('status', 'status', ''),
+)
+"""
+The fixed layout of a single player record in the compiled player
+database. The GSIS id must always come first.
+"""
+
+_record_attrs = tuple(attr for _, attr, _ in _record_fields)
+
 
 def _create_players(jsonf=None):
     """
     Creates a dict of Player objects from the players.json file, keyed
     by GSIS ids.
+
+    If a compiled copy of the player database exists next to the JSON
+    file and was built from the same JSON data, it is used instead since
+    it is much faster to load. Otherwise, the compiled copy is (re)built
+    from the JSON data if the directory is writable.
     """
     if jsonf is None:
         jsonf = _player_json_file
+
+    records = _read_compiled_players(jsonf)
+    if records is not None:
+        players = {}
+        for record in records:
+            players[record[0]] = Player._from_record(record)
+        return players
+
     try:
-        data = json.loads(open(jsonf).read())
+        data = nflgame.jsonlib.loads(open(jsonf).read())
     except IOError:
         return {}
+    _write_compiled_players(jsonf, data)
 
     players = {}
     for playerid in data:
@@ -28,6 +81,143 @@ def _create_players(jsonf=None):
     return players
 
 
+def _compiled_players_file(jsonf):
+    """
+    Returns the path of the compiled player database for the JSON
+    player database at jsonf.
+    """
+    return os.path.splitext(jsonf)[0] + '.marshal'
+
+
+def _json_fingerprint(jsonf):
+    """
+    Returns a (size, MD5 digest) pair identifying the contents of the
+    JSON player database at jsonf, or None if it can't be read.
+    """
+    try:
+        with open(jsonf, 'rb') as fp:
+            data = fp.read()
+    except IOError:
+        return None
+    return len(data), hashlib.md5(data).hexdigest()
+
+
+def _read_compiled_players(jsonf):
+    """
+    Returns a list of player records from the compiled player database
+    corresponding to jsonf. If the compiled database doesn't exist, was
+    built from different JSON data or can't be read, None is returned.
+
+    File modification times aren't used, since they aren't preserved
+    when nflgame is installed or checked out.
+    """
+    fpath = _compiled_players_file(jsonf)
+    try:
+        with open(fpath, 'rb') as fp:
+            version, fields, fingerprint, records = marshal.load(fp)
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != _COMPILED_VERSION or fields != _record_attrs:
+        return None
+    if os.path.exists(jsonf):
+        size = os.path.getsize(jsonf)
+        if size != fingerprint[0] or _json_fingerprint(jsonf) != fingerprint:
+            return None
+    return records
+
+
+def _write_compiled_players(jsonf, data):
+    """
+    Writes the compiled player database corresponding to jsonf from
+    data, which should be a dict of player meta data keyed by GSIS id
+    (i.e., the contents of players.json).
+
+    The file is written atomically. If it cannot be written, this
+    silently does nothing.
+    """
+    fingerprint = _json_fingerprint(jsonf)
+    if fingerprint is None:
+        return
+    records = []
+    for meta in data.itervalues():
+        records.append(tuple(meta.get(key, default)
+                             for key, _, default in _record_fields))
+    fpath = _compiled_players_file(jsonf)
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(fpath) or '.',
+                                   prefix='.players-')
+        with os.fdopen(fd, 'wb') as fp:
+            marshal.dump((_COMPILED_VERSION, _record_attrs, fingerprint,
+                          records), fp)
+        os.chmod(tmp, 0o644)
+        os.rename(tmp, fpath)
+    except (IOError, OSError):
+        pass
+
+
+class _LazyPlayers (collections.MutableMapping):
+    """
+    A dict-like mapping of GSIS ids to Player objects that defers reading
+    the players.json file until the mapping is first used.
+
+    This keeps `import nflgame` cheap for programs that never look at
+    player meta data.
+    """
+    def __init__(self, jsonf=None):
+        self._jsonf = jsonf
+        self._players = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._players is None:
+            with self._lock:
+                if self._players is None:
+                    self._players = _create_players(self._jsonf)
+        return self._players
+
+    def __getitem__(self, playerid):
+        return self._load()[playerid]
+
+    def __setitem__(self, playerid, player):
+        self._load()[playerid] = player
+
+    def __delitem__(self, playerid):
+        del self._load()[playerid]
+
+    def __contains__(self, playerid):
+        return playerid in self._load()
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __repr__(self):
+        return repr(self._load())
+
+    def keys(self):
+        return self._load().keys()
+
+    def values(self):
+        return self._load().values()
+
+    def items(self):
+        return self._load().items()
+
+    def iterkeys(self):
+        return self._load().iterkeys()
+
+    def itervalues(self):
+        return self._load().itervalues()
+
+    def iteritems(self):
+        return self._load().iteritems()
+
+    def get(self, playerid, default=None):
+        return self._load().get(playerid, default)
+
+
 class Player (object):
     """
     Player instances represent meta information about a single player.
@@ -53,7 +243,20 @@ class Player (object):
         self.weight = data.get('weight', '')
         self.years_pro = data.get('years_pro', 0)
         self.status = data.get('status', '')
+        self._set_aliases()
 
+    @classmethod
+    def _from_record(cls, record):
+        """
+        Creates a Player from a record in the compiled player database.
+        See _record_fields for its layout.
+        """
+        player = object.__new__(cls)
+        player.__dict__.update(itertools.izip(_record_attrs, record))
+        player._set_aliases()
+        return player
+
+    def _set_aliases(self):
         # API backwards compatibility.
         self.gsis_id = self.player_id
         self.playerid = self.player_id
@@ -112,10 +315,14 @@ class PlayerStats (object):
     GenPlayerStats.)
 
     You may also inspect whether a player has a certain property by using
-    the special __dict__ attribute. For example::
+    the stats dictionary. For example::
 
-        if 'passing_yds' in player.__dict__:
+        if 'passing_yds' in player.stats:
             # Do something with player.passing_yds
+
+    Statistics are stored in a list indexed by statistical field (see
+    `nflgame.statmap.field_id`), where None means that the player doesn't
+    have that statistic.
     """
     def __init__(self, playerid, name, home, team):
         """
@@ -127,14 +334,29 @@ class PlayerStats (object):
         self.name = name
         self.home = home
         self.team = team
-        self._stats = OrderedDict()
+        self._vals = []
 
         self.player = None
         if self.playerid in nflgame.players:
             self.player = nflgame.players[self.playerid]
 
+    def __getstate__(self):
+        # Player meta data is shared, so don't pickle a copy of it. Field
+        # indexes can differ between processes, so stats are pickled by name.
+        state = dict(self.__dict__)
+        del state['player']
+        state['_vals'] = self.stats.items()
+        return state
+
+    def __setstate__(self, state):
+        stats = state.pop('_vals')
+        self.__dict__.update(state)
+        self._vals = []
+        self._overwrite_stats(dict(stats))
+        self.player = nflgame.players.get(self.playerid)
+
     def has_cat(self, cat):
-        for f in self._stats:
+        for f in self.stats:
             if f.startswith(cat):
                 return True
         return False
@@ -177,7 +399,7 @@ class PlayerStats (object):
         all statistical categories.
         """
         n = 0
-        for f, v in self.__dict__.iteritems():
+        for f, v in self.stats.iteritems():
             if f.endswith('tds'):
                 n += v
         return n
@@ -215,28 +437,55 @@ class PlayerStats (object):
     @property
     def stats(self):
         """
-        Returns a dict of all stats for the player.
+        Returns a dict of all stats for the player, in the order of their
+        field indexes. Changing it does not change the player.
         """
-        return self._stats
+        names = nflgame.statmap.field_names
+        return OrderedDict((names[i], v) for i, v in enumerate(self._vals)
+                           if v is not None)
 
     def formatted_stats(self):
         """
         Returns a roughly-formatted string of all statistics for this player.
         """
         s = []
-        for stat, val in self._stats.iteritems():
+        for stat, val in self.stats.iteritems():
             s.append('%s: %s' % (stat, val))
         return ', '.join(s)
 
     def _add_stats(self, stats):
+        vals = self._vals
         for k, v in stats.iteritems():
-            self.__dict__[k] = self.__dict__.get(k, 0) + v
-            self._stats[k] = self.__dict__[k]
+            i = nflgame.statmap.field_id(k)
+            if i >= len(vals):
+                vals.extend([None] * (i + 1 - len(vals)))
+            old = vals[i]
+            vals[i] = v if old is None else old + v
+
+    def _add_event(self, stat, yards):
+        """
+        Adds the statistics of a single play event, where stat is the
+        entry for its category id in `nflgame.statmap.table` and yards is
+        an integer.
+        """
+        ids, _, yds_id, _, value, size = stat
+        vals = self._vals
+        if len(vals) < size:
+            vals.extend([None] * (size - len(vals)))
+        if yds_id is not None:
+            old = vals[yds_id]
+            vals[yds_id] = yards if old is None else old + yards
+        for i in ids:
+            old = vals[i]
+            vals[i] = value if old is None else old + value
 
     def _overwrite_stats(self, stats):
+        vals = self._vals
         for k, v in stats.iteritems():
-            self.__dict__[k] = v
-            self._stats[k] = self.__dict__[k]
+            i = nflgame.statmap.field_id(k)
+            if i >= len(vals):
+                vals.extend([None] * (i + 1 - len(vals)))
+            vals[i] = v
 
     def __str__(self):
         """
@@ -266,8 +515,7 @@ class PlayerStats (object):
         else:
             home = self.home
         new_player = self.__class__(self.playerid, self.name, home, self.team)
-        new_player._add_stats(self._stats)
-        new_player._add_stats(other._stats)
+        new_player._vals = _add_vals(self._vals, other._vals)
 
         return new_player
 
@@ -277,20 +525,19 @@ class PlayerStats (object):
 
         new_player = GamePlayerStats(self.playerid,
                                      self.name, self.home, self.team)
-        new_player._add_stats(self._stats)
-        for bk, bv in other._stats.iteritems():
-            if bk not in new_player._stats:  # stat was taken away? ignore.
+        vals = list(self._vals)
+        for i, bv in enumerate(other._vals[:len(vals)]):
+            if bv is None or vals[i] is None:  # stat was taken away? ignore.
                 continue
 
-            new_player._stats[bk] -= bv
-            if new_player._stats[bk] == 0:
-                del new_player._stats[bk]
-            else:
-                new_player.__dict__[bk] = new_player._stats[bk]
+            vals[i] -= bv
+            if vals[i] == 0:
+                vals[i] = None
+        new_player._vals = vals
 
         anydiffs = False
-        for k, v in new_player._stats.iteritems():
-            if v > 0:
+        for v in vals:
+            if v is not None and v > 0:
                 anydiffs = True
                 break
         if not anydiffs:
@@ -298,6 +545,11 @@ class PlayerStats (object):
         return new_player
 
     def __getattr__(self, name):
+        i = nflgame.statmap.field_index.get(name)
+        if i is not None and i < len(self._vals) \
+                and self._vals[i] is not None:
+            return self._vals[i]
+
         # If name has one of the categories as a prefix, then return
         # a default value of zero
         for cat in nflgame.statmap.categories:
@@ -332,6 +584,21 @@ class PlayerStats (object):
         return rating
 
 
+def _add_vals(a, b):
+    """
+    Returns the sum of two lists of player statistics (see PlayerStats),
+    where a statistic is None only if it is None in both.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    vals = list(a)
+    for i, v in enumerate(b):
+        if v is not None:
+            old = vals[i]
+            vals[i] = v if old is None else old + v
+    return vals
+
+
 class GamePlayerStats (PlayerStats):
     def __init__(self, playerid, name, home, team):
         super(GamePlayerStats, self).__init__(playerid, name, home, team)
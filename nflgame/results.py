@@ -0,0 +1,298 @@
+"""
+The results module keeps a table of the results of finished games, so
+that scores and winners can be looked up without reading (let alone
+decoding) any GameCenter JSON data.
+
+The table is stored in `results.json` next to `schedule.json`. It has
+one row per finished game, keyed by GSIS identifier, with the final
+score, the score of each quarter and the team statistics of both teams.
+Everything else about a game (its week, kickoff time, etc.) is found by
+joining on the schedule, which `nflgame.results.search` does.
+
+Rows are added to the table whenever `nflgame.game.Game.save` saves a
+finished game. If `nflgame.game.cache_dir` is set, those rows go to a
+`results.json` there, which is read in addition to the one that comes
+with nflgame. Use the `nflgame-update-results` script to build the table
+from every game on disk.
+
+`nflgame.game.summary` (and so `nflgame.summaries`) reads from the table
+before anything else.
+"""
+from __future__ import absolute_import, division, print_function
+import argparse
+import json
+import os
+import os.path as path
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import nflgame.game
+import nflgame.jsonlib
+import nflgame.sched
+
+_results_json_file = path.join(path.dirname(__file__), 'results.json')
+
+_FORMAT = 1
+"""
+The version of the layout of rows in `results.json`. Files with another
+version are ignored.
+"""
+
+_FIELDS = ('home', 'away', 'qtr', 'clock', 'down', 'togo',
+           'score_home', 'score_away', 'score_home_q1', 'score_away_q1',
+           'score_home_q2', 'score_away_q2', 'score_home_q3',
+           'score_away_q3', 'score_home_q4', 'score_away_q4',
+           'score_home_q5', 'score_away_q5', 'stats_home', 'stats_away')
+"""
+The columns of each row. qtr and clock are those of the game clock,
+and team statistics are lists in the order of the fields of
+`nflgame.game.TeamStats`.
+"""
+
+_table = None
+"""
+The results table mapping GSIS id to row, read from disk the first time
+it's needed. Use `_get_table` to access it.
+"""
+
+_lock = threading.Lock()
+
+
+def get(eid):
+    """
+    Returns a `nflgame.game.GameSummary` of the finished game with GSIS
+    identifier eid from the results table, or None if it isn't there.
+    """
+    row = _get_table().get(eid)
+    if row is None:
+        return None
+    return _summary(eid, row)
+
+
+def search(year, week=None, home=None, away=None, kind='REG'):
+    """
+    Returns a list of `nflgame.game.GameSummary` objects, in schedule
+    order, of every game in the results table that matches the given
+    criteria. Games that aren't in the table are left out, so no game
+    data is ever read or downloaded. (Use `nflgame.summaries` to get
+    every game.)
+
+    The criteria are the same as those of `nflgame.games`. The schedule
+    information of each game is in its `schedule` attribute.
+    """
+    table = _get_table()
+    summaries = []
+    for info in nflgame._search_schedule(year, week, home, away, kind):
+        row = table.get(info['eid'])
+        if row is not None:
+            summaries.append(_summary(info['eid'], row))
+    return summaries
+
+
+def add(game, directory=None):
+    """
+    Adds the result of game (a `nflgame.game.GameSummary`, which may be
+    a `nflgame.game.Game`) to the results table, both in memory and in
+    the `results.json` file in directory. If directory is None, the file
+    next to `schedule.json` is used. Nothing is added if the game isn't
+    over.
+
+    The file is rewritten atomically while holding a lock on it, so
+    processes adding results at the same time don't lose each other's.
+    An IOError or OSError is raised if it can't be written.
+    """
+    if not game.game_over():
+        return
+    row = _row(game)
+    with _lock:
+        _get_table()[game.eid] = row
+    fpath = _results_path(directory)
+    lock = _lock_file(fpath)
+    try:
+        rows = _read(fpath)
+        rows[game.eid] = row
+        _write(fpath, rows)
+    finally:
+        _unlock_file(lock)
+
+
+def build(directory=None, verbose=False):
+    """
+    Builds the results table from every finished game whose JSON data is
+    on disk, and writes it to `results.json` in directory. If directory
+    is None, the file next to `schedule.json` is used.
+    """
+    rows = {}
+    for eid in nflgame.sched.games:
+        if not nflgame.game._is_cached(eid):
+            continue
+        try:
+            data = nflgame.jsonlib.loads(nflgame.game._get_json_data(eid))
+            s = nflgame.game.GameSummary(eid, data[eid])
+        except (ValueError, KeyError):
+            continue
+        if s.game_over():
+            rows[eid] = _row(s)
+    fpath = _results_path(directory)
+    _write(fpath, rows)
+    if verbose:
+        print('Wrote the results of %d games to %s' % (len(rows), fpath))
+    with _lock:
+        _get_table().update(rows)
+
+
+def _get_table():
+    """
+    Returns the results table, reading it from disk first if it hasn't
+    been read yet. Rows in `nflgame.game.cache_dir` take precedence over
+    those that come with nflgame.
+    """
+    global _table
+
+    if _table is None:
+        table = _read(_results_json_file)
+        if nflgame.game.cache_dir is not None:
+            table.update(_read(_results_path(nflgame.game.cache_dir)))
+        _table = table
+    return _table
+
+
+def _results_path(directory):
+    if directory is None:
+        return _results_json_file
+    return path.join(directory, 'results.json')
+
+
+def _read(fpath):
+    """
+    Returns a dict mapping GSIS id to row of the results table in the
+    file at fpath. It is empty if the file doesn't exist or is of
+    another format.
+    """
+    try:
+        data = nflgame.jsonlib.loads(open(fpath).read())
+    except (IOError, ValueError):
+        return {}
+    if data.get('format') != _FORMAT:
+        return {}
+    return dict(data['results'])
+
+
+def _write(fpath, rows):
+    """
+    Writes the results table rows (a dict mapping GSIS id to row) to
+    fpath. The file is replaced atomically.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.dirname(fpath) or '.',
+                               prefix='.results-')
+    try:
+        with os.fdopen(fd, 'w') as fp:
+            json.dump({'format': _FORMAT, 'time': time.time(),
+                       'fields': _FIELDS,
+                       'results': sorted(rows.items())},
+                      fp, sort_keys=True, separators=(',', ':'))
+        os.chmod(tmp, 0o644)
+        os.rename(tmp, fpath)
+    except:
+        os.remove(tmp)
+        raise
+
+
+def _lock_file(fpath):
+    """
+    Blocks until this process holds the lock on writing the results
+    table at fpath, and returns the open lock file, which is released
+    with _unlock_file. None is returned if fcntl isn't available.
+    """
+    if fcntl is None:
+        return None
+    dpath = path.dirname(fpath) or '.'
+    fp = open(path.join(dpath, '.results.lock'), 'a')
+    fcntl.flock(fp.fileno(), fcntl.LOCK_EX)
+    return fp
+
+
+def _unlock_file(lock):
+    """
+    Releases a lock returned by _lock_file. It is released explicitly
+    rather than by closing the file, since processes forked while it
+    was held share it and would keep it locked.
+    """
+    if lock is None:
+        return
+    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+    lock.close()
+
+
+def _row(game):
+    """
+    Returns the row of the results table for game, which is a
+    `nflgame.game.GameSummary`.
+    """
+    row = []
+    for field in _FIELDS:
+        if field in ('qtr', 'clock'):
+            row.append(getattr(game.time, field))
+        elif field in ('stats_home', 'stats_away'):
+            stats = getattr(game, field)
+            row.append(list(stats[:-1]) + [str(stats.pos_time)])
+        else:
+            row.append(getattr(game, field))
+    return row
+
+
+def _summary(eid, row):
+    """
+    Returns a `nflgame.game.GameSummary` of the game with GSIS id eid
+    from its row in the results table.
+    """
+    vals = dict(zip(_FIELDS, row))
+    s = object.__new__(nflgame.game.GameSummary)
+    s.eid = eid
+    s.schedule = nflgame.sched.games.get(eid, None)
+    s.gamekey = None
+    if s.schedule is not None:
+        s.gamekey = s.schedule['gamekey']
+    s.time = nflgame.game.GameClock(vals.pop('qtr'), vals.pop('clock'))
+    for field in ('stats_home', 'stats_away'):
+        stats = vals.pop(field)
+        pos_time = nflgame.game.PossessionTime(stats[-1])
+        vals[field] = nflgame.game.TeamStats(*(stats[:-1] + [pos_time]))
+    for field, v in vals.iteritems():
+        setattr(s, field, v)
+    nflgame.game._set_winner(s)
+    return s
+
+
+def eprint(*args, **kwargs):
+    kwargs['file'] = sys.stderr
+    print(*args, **kwargs)
+
+
+def run():
+    parser = argparse.ArgumentParser(
+        description='Builds the table of results of finished games from '
+                    'the GameCenter JSON data on disk.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    aa = parser.add_argument
+    aa('--dir', type=str, default=None,
+       help='The directory to write results.json to. If this option is '
+            'not set, then the results.json file that comes with nflgame '
+            'is written.')
+    args = parser.parse_args()
+
+    directory = args.dir or path.dirname(_results_json_file)
+    if not os.access(directory, os.W_OK):
+        eprint('I do not have write access to "%s".' % directory)
+        sys.exit(1)
+    build(directory, verbose=True)
+
+if __name__ == '__main__':
+    run()
@@ -1,12 +1,35 @@
+import bisect
+import calendar
 from collections import OrderedDict
 import datetime
-import json
 import os.path
+import sys
+import threading
+
+try:
+    import pytz
+except ImportError:
+    pass
+
+import nflgame.jsonlib
 
 __pdoc__ = {}
 
 _sched_json_file = os.path.join(os.path.dirname(__file__), 'schedule.json')
 
+_STALE_AFTER = 60 * 60 * 24
+"""
+The number of seconds after which the schedule is considered out of date.
+"""
+
+_refresh_lock = threading.Lock()
+
+_index = None
+"""
+The most recently built `nflgame.sched._Index`. Use `_get_index` to
+access it, which rebuilds it when the schedule changes.
+"""
+
 
 def _create_schedule(jsonf=None):
     """
@@ -15,32 +38,213 @@ def _create_schedule(jsonf=None):
     started. Keys in the dictionary are GSIS ids and values are
     dictionaries with the following keys: week, month, year, home,
     away, wday, gamekey, season_type, time.
+
+    This only reads local data. It never contacts NFL.com, even if the
+    schedule is out of date. Use `nflgame.sched.refresh` for that.
     """
-    day = 60 * 60 * 24
     if jsonf is None:
         jsonf = _sched_json_file
     try:
-        data = json.loads(open(jsonf).read())
+        data = nflgame.jsonlib.loads(open(jsonf).read())
     except IOError:
-        return OrderedDict()
+        return OrderedDict(), datetime.datetime.utcfromtimestamp(0)
 
     d = OrderedDict()
     for gsis_id, info in data.get('games', []):
         d[gsis_id] = info
     last_updated = datetime.datetime.utcfromtimestamp(data.get('time', 0))
-
-    if (datetime.datetime.utcnow() - last_updated).total_seconds() >= day:
-        # Only try to update if we can write to the schedule file.
-        if os.access(jsonf, os.W_OK):
-            import nflgame.live
-            import nflgame.update_sched
-            year, week = nflgame.live.current_year_and_week()
-            phase = nflgame.live._cur_season_phase
-            nflgame.update_sched.update_week(d, year, phase, week)
-            nflgame.update_sched.write_schedule(jsonf, d)
-            last_updated = datetime.datetime.now()
     return d, last_updated
 
+
+def is_stale():
+    """
+    Returns true if the schedule hasn't been updated in the last day.
+    """
+    age = datetime.datetime.utcnow() - last_updated
+    return age.total_seconds() >= _STALE_AFTER
+
+
+def refresh(background=False):
+    """
+    Updates the schedule for the current week with data from NFL.com
+    and writes it back to the schedule.json file if it is writable.
+
+    When the new schedule is ready, `nflgame.sched.games` and
+    `nflgame.sched.last_updated` are replaced with new values. The
+    existing dictionary is never modified in place, so readers always
+    see either the old or the new schedule.
+
+    If background is true, the update is done in a daemon thread, which
+    is returned immediately. Errors in the background are reported on
+    stderr rather than raised.
+    """
+    if background:
+        t = threading.Thread(target=_refresh_quietly)
+        t.daemon = True
+        t.start()
+        return t
+    _refresh()
+
+
+def _refresh():
+    global games, last_updated
+
+    import nflgame.live
+    import nflgame.update_sched
+
+    with _refresh_lock:
+        year, week = nflgame.live.current_year_and_week()
+        phase = nflgame.live._cur_season_phase
+        sched = OrderedDict(games)
+        nflgame.update_sched.update_week(sched, year, phase, week)
+        if os.access(_sched_json_file, os.W_OK):
+            nflgame.update_sched.write_schedule(_sched_json_file, sched)
+        games, last_updated = sched, datetime.datetime.utcnow()
+
+
+def _refresh_quietly():
+    try:
+        _refresh()
+    except Exception as e:
+        print >> sys.stderr, 'Could not update the schedule: %s' % e
+
+
+class _Index (object):
+    """
+    Indexes the schedule so that searching for games only touches
+    the games that could possibly match.
+
+    Each index maps a key to a list of schedule dictionaries in schedule
+    order. The indexes are keyed by (year, season_type, week), by
+    (year, season_type), by (team, season_type) and by season_type.
+    (The schedule itself serves as the index by GSIS id.)
+
+    Kickoff times are also available as UTC epoch seconds. They are
+    computed for every game the first time one is needed (this requires
+    pytz).
+    """
+    def __init__(self, games):
+        self.games = games
+        self.size = len(games)
+        self._kickoffs = None
+        self._kickoff_times = None
+        self._kickoff_infos = None
+        self.order = {}
+        self.by_week = {}
+        self.by_season = {}
+        self.by_team = {}
+        self.by_kind = {}
+        for i, info in enumerate(games.itervalues()):
+            y, t, w = info['year'], info['season_type'], info['week']
+            self.order[info['eid']] = i
+            self.by_week.setdefault((y, t, w), []).append(info)
+            self.by_season.setdefault((y, t), []).append(info)
+            self.by_team.setdefault((info['home'], t), []).append(info)
+            self.by_team.setdefault((info['away'], t), []).append(info)
+            self.by_kind.setdefault(t, []).append(info)
+
+    def is_current(self):
+        """
+        Returns true if this index still corresponds to the schedule.
+        """
+        return self.games is games and self.size == len(games)
+
+    def candidates(self, year, week, team, kind):
+        """
+        Returns a list of schedule dictionaries, in schedule order, that
+        is a superset of the games with the given year, week, team and
+        kind (season type). Any of year, week or team may be None, and
+        year and week may be lists.
+
+        The caller is responsible for filtering the candidates.
+        """
+        years = set(year) if isinstance(year, list) else [year]
+        weeks = set(week) if isinstance(week, list) else [week]
+        if year is not None and week is not None:
+            lists = [self.by_week.get((y, kind, w), [])
+                     for y in years for w in weeks]
+        elif team is not None:
+            lists = [self.by_team.get((team, kind), [])]
+        elif year is not None:
+            lists = [self.by_season.get((y, kind), []) for y in years]
+        else:
+            lists = [self.by_kind.get(kind, [])]
+
+        if len(lists) == 1:
+            return lists[0]
+        infos = [info for infos in lists for info in infos]
+        return sorted(infos, key=lambda info: self.order[info['eid']])
+
+    def kickoff(self, info):
+        """
+        Returns the kickoff time of the game described by the schedule
+        dictionary info as UTC epoch seconds.
+        """
+        if self._kickoffs is None:
+            self._load_kickoffs()
+        try:
+            return self._kickoffs[info['eid']]
+        except KeyError:
+            return _kickoff_epochs([info])[info['eid']]
+
+    def kickoff_range(self, start, end):
+        """
+        Returns a list of schedule dictionaries, ordered by kickoff time,
+        of every game with a kickoff time in the inclusive range
+        [start, end], where both are UTC epoch seconds.
+        """
+        if self._kickoffs is None:
+            self._load_kickoffs()
+        lo = bisect.bisect_left(self._kickoff_times, start)
+        hi = bisect.bisect_right(self._kickoff_times, end)
+        return self._kickoff_infos[lo:hi]
+
+    def _load_kickoffs(self):
+        kickoffs = _kickoff_epochs(self.games.itervalues())
+        pairs = sorted((kickoffs[info['eid']], self.order[info['eid']], info)
+                       for info in self.games.itervalues())
+        self._kickoff_times = [t for t, _, _ in pairs]
+        self._kickoff_infos = [info for _, _, info in pairs]
+        self._kickoffs = kickoffs
+
+
+def _kickoff_epochs(infos):
+    """
+    Returns a dict mapping GSIS id to the kickoff time, in UTC epoch
+    seconds, of every game in infos (an iterable of schedule dicts).
+
+    Game times in the schedule are in US/Eastern. Since localizing a
+    time with pytz is comparatively slow, the UTC offset is only looked
+    up once per calendar day (and once more for the early morning hours,
+    in case it's the day of a daylight saving time switch).
+    """
+    eastern = pytz.timezone('US/Eastern')
+    offsets = {}
+    kickoffs = {}
+    for info in infos:
+        eid = info['eid']
+        hour, minute = info['time'].strip().split(':')
+        d = datetime.datetime(int(eid[:4]), info['month'], info['day'],
+                              (int(hour) + 12) % 24, int(minute))
+        key = (d.date(), d.hour < 3)
+        if key not in offsets:
+            offsets[key] = eastern.localize(d).utcoffset()
+        kickoffs[eid] = calendar.timegm((d - offsets[key]).timetuple())
+    return kickoffs
+
+
+def _get_index():
+    """
+    Returns an index of the current schedule, building it first if the
+    schedule has changed since the index was last built.
+    """
+    global _index
+
+    idx = _index
+    if idx is None or not idx.is_current():
+        idx = _index = _Index(games)
+    return idx
+
 games, last_updated = _create_schedule()
 
 __pdoc__['nflgame.sched.games'] = """
@@ -52,5 +256,5 @@ home, away, wday, gamekey, season_type, time.
 
 __pdoc__['nflgame.sched.last_updated'] = """
 A `datetime.datetime` object representing the last time the schedule
-was updated.
+was updated (in UTC).
 """
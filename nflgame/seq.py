@@ -233,8 +233,8 @@ class GenPlayerStats (Gen):
         """
         def gen():
             for p in self:
-                for f in p.__dict__:
-                    if f.endswith('tds') and p.__dict__[f] > 0:
+                for f, v in p.stats.iteritems():
+                    if f.endswith('tds') and v > 0:
                         yield p
                         break
         return self.__class__(gen())
@@ -321,9 +321,10 @@ class GenPlayerStats (Gen):
             if p.player is not None:
                 d['pos'] = p.player.position
 
+            stats = p.stats
             for field in fields:
-                if field in p.__dict__:
-                    d[field] = p.__dict__[field]
+                if field in stats:
+                    d[field] = stats[field]
                 else:
                     d[field] = ""
             rows.append(d)
@@ -39,7 +39,11 @@ the way to "I have no fucking clue."
 long contains a verbatim description from nflgsis.com. Some of the information
 clearly references legacy systems, but alas, it is included as it adds to the
 context of each statistical category.
+
+Every statistical field is also given an index (see field_id), so that
+player statistics can be stored in a list instead of a dictionary.
 """
+import threading
 
 
 def values(category_id, yards):
@@ -50,13 +54,7 @@ def values(category_id, yards):
     assert category_id in idmap, \
         'Category identifier %d is not known.' % category_id
     info = idmap[category_id]
-    try:
-        yards = int(yards)
-    except ValueError:
-        yards = 0
-    except TypeError:
-        # Catch errors if yards is a NoneType
-        yards = 0
+    yards = to_yards(yards)
 
     vals = {}
     if info['yds']:
@@ -65,6 +63,22 @@ def values(category_id, yards):
         vals[f] = info.get('value', 1)
     return vals
 
+
+def to_yards(yards):
+    """
+    Converts the yards of a statistic from GameCenter JSON to an integer.
+    If it isn't a number, 0 is returned.
+    """
+    if type(yards) is int:
+        return yards
+    try:
+        return int(yards)
+    except ValueError:
+        return 0
+    except TypeError:
+        # Catch errors if yards is a NoneType
+        return 0
+
 categories = ("passing", "rushing", "receiving",
               "fumbles", "kicking", "punting", "kickret", "puntret",
               "defense", "penalty")
@@ -922,3 +936,62 @@ idmap = {
                 'ending in a touchback.',
     },
 }
+
+field_names = []
+"""
+The names of all known statistical fields, in the order of their indexes.
+Fields that appear in idmap come first. Others (like the ones that only
+appear in game level statistics) are added as they are seen, so indexes
+of those differ between processes.
+"""
+
+field_index = {}
+"""A dictionary from statistical field name to its index."""
+
+_field_lock = threading.Lock()
+
+
+def field_id(name):
+    """
+    Returns the index of the statistical field name, giving it the next
+    index if it doesn't have one yet.
+    """
+    i = field_index.get(name)
+    if i is None:
+        with _field_lock:
+            i = field_index.get(name)
+            if i is None:
+                i = len(field_names)
+                field_names.append(str(name))
+                field_index[name] = i
+    return i
+
+for _id in sorted(idmap):
+    for _f in idmap[_id]['fields']:
+        field_id(_f)
+    if idmap[_id]['yds']:
+        field_id(idmap[_id]['yds'])
+del _id, _f
+
+
+def _compile():
+    compiled = {}
+    for category_id, info in idmap.iteritems():
+        names = tuple(info['fields'])
+        ids = tuple(field_id(f) for f in names)
+        yds_name = info['yds'] or None
+        yds_id = None if yds_name is None else field_id(yds_name)
+        used = ids if yds_id is None else ids + (yds_id,)
+        size = max(used) + 1 if used else 0
+        compiled[category_id] = (ids, names, yds_id, yds_name,
+                                 info.get('value', 1), size)
+    return compiled
+
+table = _compile()
+"""
+idmap compiled for parsing plays. It maps each category id to a tuple
+(ids, names, yds_id, yds_name, value, size), where names are the
+statistical fields incremented by value and ids are their indexes,
+yds_name is the field that the yards are added to (or None) and yds_id
+is its index, and size is one more than the largest of those indexes.
+"""
@@ -485,6 +485,9 @@ def run():
     with open(args.json_update_file, 'w+') as fp:
         json.dump(metas, fp, indent=4, sort_keys=True,
                   separators=(',', ': '))
+    # Also emit the compiled player database so that loading players
+    # doesn't need to parse the JSON.
+    nflgame.player._write_compiled_players(args.json_update_file, metas)
 
     if len(errors) > 0:
         eprint('\n')
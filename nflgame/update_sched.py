@@ -4,6 +4,7 @@ import time
 import json
 import os
 import sys
+import tempfile
 import urllib2
 from collections import OrderedDict
 import xml.dom.minidom as xml
@@ -132,12 +133,20 @@ def update_week(sched, year, stype, week):
 
 
 def write_schedule(fpath, sched):
+    """
+    Writes the schedule to fpath. The file is replaced atomically, so
+    concurrent readers never see a partially written schedule.
+    """
     alist = []
     for gsis_id in sorted(sched):
         alist.append([gsis_id, sched[gsis_id]])
-    json.dump({'time': time.time(), 'games': alist},
-              open(fpath, 'w+'), indent=1, sort_keys=True,
-              separators=(',', ': '))
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(fpath) or '.',
+                               prefix='.schedule-')
+    with os.fdopen(fd, 'w') as fp:
+        json.dump({'time': time.time(), 'games': alist},
+                  fp, indent=1, sort_keys=True, separators=(',', ': '))
+    os.chmod(tmp, 0o644)
+    os.rename(tmp, fpath)
 
 
 def eprint(*args, **kwargs):
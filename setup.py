@@ -51,11 +51,15 @@ setup(
     ],
     platforms='ANY',
     packages=['nflgame'],
-    package_data={'nflgame': ['players.json', 'schedule.json',
-                              'gamecenter-json/*.json.gz']},
+    package_data={'nflgame': ['players.json', 'players.marshal',
+                              'schedule.json', 'results.json',
+                              'gamecenter-json/*.json.gz',
+                              'gamecenter-json/*.zip']},
     data_files=[('share/doc/nflgame', ['README.md', 'CHANGELOG', 'UNLICENSE',
                                        'longdesc.rst']),
                 ('share/doc/nflgame/doc', glob('doc/nflgame/*.html'))],
-    scripts=['scripts/nflgame-update-players'],
+    scripts=['scripts/nflgame-update-players',
+             'scripts/nflgame-pack-archives',
+             'scripts/nflgame-update-results'],
     install_requires=install_requires
 )
@@ -0,0 +1,76 @@
+import glob
+import gzip
+import multiprocessing
+import os.path as path
+import shutil
+import tempfile
+import unittest
+
+import nflgame.archive
+
+_json_dir = path.join(path.dirname(nflgame.archive.__file__),
+                      'gamecenter-json')
+
+
+def _read(args):
+    eid, directory = args
+    return nflgame.archive.read(eid, directory)
+
+
+class TestArchive (unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        files = sorted(glob.glob(path.join(_json_dir, '20120909*.json.gz')))
+        self.assertTrue(len(files) > 4)
+        self.data = {}
+        for fpath in files:
+            eid = path.basename(fpath).split('.')[0]
+            shutil.copy(fpath, self.dir)
+            self.data[eid] = gzip.open(fpath).read()
+        nflgame.archive.pack(self.dir, remove=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+        with nflgame.archive._lock:
+            nflgame.archive._archives.clear()
+
+    def test_read(self):
+        for eid, data in self.data.iteritems():
+            self.assertEqual(nflgame.archive.read(eid, self.dir), data)
+        self.assertIsNone(nflgame.archive.read('2012090999', self.dir))
+
+    def test_read_in_workers_after_parent(self):
+        # The parent opens the archive before forking, so the workers
+        # inherit it.
+        eids = sorted(self.data)
+        self.assertEqual(nflgame.archive.read(eids[0], self.dir),
+                         self.data[eids[0]])
+        pool = multiprocessing.Pool(4)
+        try:
+            args = [(eid, self.dir) for eid in eids * 20]
+            got = pool.map(_read, args, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(got, [self.data[eid] for eid in eids * 20])
+
+    def test_read_in_worker_during_parent_read(self):
+        # A worker forked while the parent is in the middle of reading a
+        # game must not move the parent's file offset.
+        eids = sorted(self.data, key=lambda eid: len(self.data[eid]))
+        a, b = eids[-1], eids[-2]
+        apath = nflgame.archive.archive_path(2012, self.dir)
+        with nflgame.archive._lock:
+            member = nflgame.archive._open(apath).open(a)
+        first = member.read(1024)
+        pool = multiprocessing.Pool(1)
+        try:
+            self.assertEqual(pool.apply(_read, [(b, self.dir)]), self.data[b])
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(first + member.read(), self.data[a])
+
+
+if __name__ == '__main__':
+    unittest.main()
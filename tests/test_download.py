@@ -0,0 +1,67 @@
+import multiprocessing
+import os
+import os.path as path
+import shutil
+import tempfile
+import time
+import unittest
+
+import nflgame
+import nflgame.game
+
+_FUTURE = {
+    'eid': '2030091000', 'gamekey': '99999', 'year': 2030, 'month': 9,
+    'day': 10, 'time': '8:30', 'wday': 'Tue', 'season_type': 'REG',
+    'week': 1, 'home': 'NE', 'away': 'NYG',
+}
+
+
+def _game(eid):
+    return nflgame.game.Game(eid) is None
+
+
+class TestDownload (unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.log = path.join(self.dir, 'downloads')
+        self.saved = nflgame.game.cache_dir, nflgame.game._download
+        nflgame.game.cache_dir = self.dir
+        nflgame.game._download = self.download
+        nflgame.sched.games[_FUTURE['eid']] = _FUTURE
+
+    def tearDown(self):
+        nflgame.game.cache_dir, nflgame.game._download = self.saved
+        del nflgame.sched.games[_FUTURE['eid']]
+        shutil.rmtree(self.dir)
+
+    def download(self, eid):
+        # Stands in for an NFL.com request that fails slowly.
+        with open(self.log, 'a') as fp:
+            fp.write('%s\n' % eid)
+        time.sleep(1)
+        return None
+
+    def downloads(self, eid):
+        pool = multiprocessing.Pool(3)
+        try:
+            got = pool.map(_game, [eid] * 3, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(got, [True] * 3)
+        return len(open(self.log).read().split())
+
+    def test_failed_download_not_retried_by_waiters(self):
+        eid = '2017123115'
+        self.assertFalse(nflgame.game._is_cached(eid))
+        self.assertEqual(self.downloads(eid), 1)
+        self.assertEqual(os.listdir(self.dir), ['downloads'])
+
+    def test_games_not_kicked_off_are_not_locked(self):
+        start = time.time()
+        self.assertEqual(self.downloads(_FUTURE['eid']), 3)
+        self.assertTrue(time.time() - start < 2.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
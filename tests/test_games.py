@@ -0,0 +1,36 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import nflgame
+import nflgame.game
+
+
+def _describe(games):
+    return [(g.eid, str(g), [str(p) for p in g.drives.plays()],
+             [(p.playerid, sorted(p.stats.items()))
+              for p in g.drives.players()])
+            for g in games]
+
+
+class TestGamesParallel (unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        nflgame.game.parsed_cache_dir = self.dir
+
+    def tearDown(self):
+        nflgame.game.parsed_cache_dir = None
+        shutil.rmtree(self.dir)
+
+    def test_workers(self):
+        got = nflgame.games(2012, week=1, workers=2)
+        self.assertEqual(len(os.listdir(self.dir)), len(got))
+        self.assertTrue(all('_parsed_body' in g.__dict__ for g in got))
+        nflgame.game.parsed_cache_dir = None
+        self.assertEqual(_describe(got),
+                         _describe(nflgame.games(2012, week=1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import cPickle
+import pickle
+import unittest
+
+import nflgame
+import nflgame.game
+
+
+def _describe(game):
+    plays = [(str(p), str(p.time), str(p.yardline),
+              sorted(p._stats.items()), p.events,
+              [(x.playerid, sorted(x.stats.items())) for x in p.players])
+             for p in game.drives.plays()]
+    drives = [(str(d), str(d.pos_time), d.field_start.offset)
+              for d in game.drives]
+    players = [(p.playerid, sorted(p.stats.items())) for p in game.players]
+    return str(game), str(game.time), game.winner, drives, plays, players
+
+
+class TestPickle (unittest.TestCase):
+    def setUp(self):
+        self.game = nflgame.one(2012, 1, 'NYG', 'DAL')
+        self.game._build_all()
+
+    def round_trip(self, pickler, protocol):
+        game = pickler.loads(pickler.dumps(self.game, protocol))
+        self.assertEqual(_describe(game), _describe(self.game))
+
+    def test_protocols(self):
+        for protocol in (0, 1, 2):
+            self.round_trip(pickle, protocol)
+            self.round_trip(cPickle, protocol)
+
+    def test_unbuilt_plays(self):
+        # Pickling a drive doesn't build its plays, but they can still be
+        # built after unpickling.
+        game = self.game
+        data = game.data['drives']['1']
+        drive = nflgame.game.Drive(game, 1, game.home, data)
+        for protocol in (0, 2):
+            copy = cPickle.loads(cPickle.dumps(drive, protocol))
+            self.assertNotIn('_Drive__plays', nflgame.game._get_slots(drive))
+            self.assertEqual([str(p) for p in copy.plays],
+                             [str(p) for p in list(game.drives)[0].plays])
+
+    def test_values(self):
+        clock = nflgame.game.GameClock('3', '04:12')
+        pos = nflgame.game.FieldPosition('NE', 'NYG 20')
+        top = nflgame.game.PossessionTime('31:02')
+        for protocol in (0, 1, 2):
+            c, p, t = cPickle.loads(cPickle.dumps((clock, pos, top),
+                                                  protocol))
+            self.assertEqual((c.qtr, c.clock, c.quarter),
+                             (clock.qtr, clock.clock, clock.quarter))
+            self.assertEqual(p.offset, pos.offset)
+            self.assertEqual(t.total_seconds(), top.total_seconds())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+import nflgame
+
+
+def _eids(*args, **kwargs):
+    return [info['eid'] for info in nflgame._search_schedule(*args, **kwargs)]
+
+
+class TestSearch (unittest.TestCase):
+    def test_repeated_years_and_weeks(self):
+        week = _eids(2012, 3)
+        self.assertTrue(len(week) > 0)
+        self.assertEqual(_eids(2012, [3, 3]), week)
+        self.assertEqual(_eids([2012, 2012], 3), week)
+        self.assertEqual(_eids([2012, 2012]), _eids(2012))
+        self.assertEqual(_eids([2012, 2011, 2012], [1, 1], home='NE'),
+                         _eids([2011, 2012], 1, home='NE'))
+
+
+if __name__ == '__main__':
+    unittest.main()